@@ -392,6 +392,17 @@ ops_text = "\\\\n".join(ops) if ops else "Нет операций записи"
             ("uvm_asm.py", "uvm_asm.py"),
             ("uvm_interp.py", "uvm_interp.py"),
             ("uvm_gui.py", "uvm_gui.py"),
+            ("uvm_memory.py", "uvm_memory.py"),
+            ("uvm_codegen.py", "uvm_codegen.py"),
+            ("uvm_cache.py", "uvm_cache.py"),
+            ("uvm_trace.py", "uvm_trace.py"),
+            ("uvm_profile.py", "uvm_profile.py"),
+            ("uvm_dump.py", "uvm_dump.py"),
+            ("uvm_checkpoint.py", "uvm_checkpoint.py"),
+            ("uvm_debug.py", "uvm_debug.py"),
+            ("uvm_breakpoints.py", "uvm_breakpoints.py"),
+            ("uvm_batch.py", "uvm_batch.py"),
+            ("uvm_bench.py", "uvm_bench.py"),
             ("README.txt", "README.txt"),
             ("test_spec_format.uvm", "examples/test_spec.uvm"),
         ]
@@ -1,5 +1,55 @@
 import argparse
 import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+# Версия ассемблера: входит в ключ кеша ассемблирования (uvm_cache),
+# увеличивается при любом изменении кодирования или результата оптимизатора (-O)
+ASSEMBLER_VERSION = '1.2'
+
+# Коды операций по мнемонике IR
+OP_CODES = {'load_const': 19, 'read': 3, 'write': 20, 'max': 7}
+
+# Поля команд в порядке IR (и в порядке ключей JSON)
+OP_FIELDS = {
+    'load_const': ('address', 'constant'),
+    'read': ('dst_addr', 'src_addr'),
+    'write': ('src_addr', 'offset', 'base_addr'),
+    'max': ('addr_b', 'addr_c', 'addr_d'),
+}
+
+# Быстрый разбор JSON-строки с ключами в каноническом порядке без построения словаря
+_JSON_INT = r'(-?(?:0|[1-9][0-9]*))'
+_JSON_FIELD = r'"(\w+)"\s*:\s*' + _JSON_INT
+_JSON_FAST = re.compile(
+    r'\{\s*"op"\s*:\s*"(load_const|read|write|max)"\s*,\s*' + _JSON_FIELD +
+    r'\s*,\s*' + _JSON_FIELD + r'\s*(?:,\s*' + _JSON_FIELD + r'\s*)?\}$'
+)
+
+class AssemblyError(ValueError):
+    """Ошибка разбора строки исходника: вид ('op', 'syntax') и подробность"""
+    
+    def __init__(self, kind, detail=None):
+        super().__init__(kind, detail)
+        self.kind = kind
+        self.detail = detail
+
+# Минимальный размер IR, с которого assemble_ir использует пакетный кодировщик NumPy
+BULK_THRESHOLD = 256
+
+# Количество команд, кодируемых за один раз при потоковом ассемблировании
+STREAM_BATCH = 65536
+
+# Размер фрагмента исходника (в байтах) для параллельного ассемблирования
+PARALLEL_CHUNK_SIZE = 16 << 20
 
 def mask(bits):
     """Создание маски для указанного количества бит"""
@@ -42,54 +92,455 @@ def create_command(op_code, fields):
         
     return command.to_bytes(7, 'little')
 
-def parse_assembly_language(text):
-    """Парсинг языка ассемблера"""
-    IR = []
+def format_diagnostic(line_num, kind, detail):
+    """Текст диагностического сообщения ассемблера"""
+    if kind == 'json':
+        return f"Ошибка JSON в строке {line_num}"
+    elif kind == 'field':
+        return f"Ошибка: отсутствует поле {detail} в строке {line_num}"
+    elif kind == 'syntax':
+        return f"Синтаксическая ошибка в строке {line_num}: {detail}"
+    return f"Неизвестная операция: '{detail}' в строке {line_num}"
+
+def print_diagnostic(line_num, kind, detail):
+    """Вывод диагностического сообщения ассемблера"""
+    print(format_diagnostic(line_num, kind, detail))
+
+def parse_command(line):
+    """
+    Разбор одной непустой строки исходника в команду IR.
     
-    for line_num, line in enumerate(text.strip().splitlines(), 1):
+    Поддерживаются два синтаксиса:
+      JSON:       {"op": "max", "addr_b": 782, "addr_c": 367, "addr_d": 565}
+      компактный: max 782 367 565  (операнды в порядке IR, # - комментарий)
+    """
+    if line[0] == '{':
+        match = _JSON_FAST.match(line)
+        if match:
+            op, key1, value1, key2, value2, key3, value3 = match.groups()
+            if key3 is None:
+                if OP_FIELDS[op] == (key1, key2):
+                    return (op, int(value1), int(value2))
+            elif OP_FIELDS[op] == (key1, key2, key3):
+                return (op, int(value1), int(value2), int(value3))
+        
+        # Произвольный порядок ключей, пробелы и т.п. - полноценный разбор JSON
+        cmd_dict = json.loads(line)
+        op = cmd_dict.get('op')
+        fields = OP_FIELDS.get(op)
+        if fields is None:
+            raise AssemblyError('op', op)
+        return (op,) + tuple(cmd_dict[field] for field in fields)
+    
+    parts = line.split('#', 1)[0].split()
+    op = parts[0]
+    fields = OP_FIELDS.get(op)
+    if fields is None:
+        raise AssemblyError('op', op)
+    if len(parts) != len(fields) + 1:
+        raise AssemblyError('syntax', line)
+    
+    try:
+        return (op,) + tuple(int(part) for part in parts[1:])
+    except ValueError:
+        raise AssemblyError('syntax', line)
+
+def iter_assembly_language(lines, report=print_diagnostic):
+    """
+    Потоковый парсинг языка ассемблера: генератор команд IR по строкам исходника.
+    Ошибки передаются в report(номер строки, вид, подробность).
+    """
+    for line_num, line in enumerate(lines, 1):
         line = line.strip()
         if not line or line.startswith('#'):
             continue
             
         try:
-            cmd_dict = json.loads(line)
-            op = cmd_dict.get('op')
-            
-            if op == 'load_const':
-                IR.append(('load_const', cmd_dict['address'], cmd_dict['constant']))
-            elif op == 'read':
-                IR.append(('read', cmd_dict['dst_addr'], cmd_dict['src_addr']))
-            elif op == 'write':
-                IR.append(('write', cmd_dict['src_addr'], cmd_dict['offset'], cmd_dict['base_addr']))
-            elif op == 'max':
-                IR.append(('max', cmd_dict['addr_b'], cmd_dict['addr_c'], cmd_dict['addr_d']))
-            else:
-                print(f"Неизвестная операция: '{op}'")
-                
+            cmd = parse_command(line)
         except json.JSONDecodeError:
-            print(f"Ошибка JSON в строке {line_num}")
+            report(line_num, 'json', None)
+            continue
         except KeyError as e:
-            print(f"Ошибка: отсутствует поле {e}")
+            report(line_num, 'field', e)
+            continue
+        except AssemblyError as e:
+            report(line_num, e.kind, e.detail)
+            continue
+        
+        yield cmd
+
+def format_command(cmd, syntax='json'):
+    """Запись команды IR в JSON или компактном синтаксисе"""
+    if syntax == 'compact':
+        return ' '.join([cmd[0]] + [str(value) for value in cmd[1:]])
     
-    return IR
+    fields = dict(zip(OP_FIELDS[cmd[0]], cmd[1:]))
+    return json.dumps({'op': cmd[0], **fields})
+
+def convert_source(input_path, output_path, syntax, report=print_diagnostic):
+    """
+    Потоковое преобразование исходника между JSON и компактным синтаксисом.
+    Комментарии и пустые строки сохраняются, ошибочные строки переносятся как есть.
+    Возвращает количество преобразованных команд.
+    """
+    count = 0
+    
+    with open(input_path, 'r', encoding='utf-8') as source, \
+         open(output_path, 'w', encoding='utf-8') as output:
+        for line_num, line in enumerate(source, 1):
+            line = line.rstrip('\n')
+            stripped = line.strip()
+            
+            if not stripped or stripped.startswith('#'):
+                output.write(line + '\n')
+                continue
+            
+            try:
+                cmd = parse_command(stripped)
+            except (json.JSONDecodeError, KeyError, AssemblyError) as e:
+                if isinstance(e, AssemblyError):
+                    report(line_num, e.kind, e.detail)
+                elif isinstance(e, KeyError):
+                    report(line_num, 'field', e)
+                else:
+                    report(line_num, 'json', None)
+                output.write(line + '\n')
+                continue
+            
+            # Комментарий в конце компактной строки сохраняется
+            comment = ''
+            if stripped[0] != '{' and '#' in stripped:
+                comment = stripped.split('#', 1)[1].strip()
+            
+            if comment and syntax == 'json':
+                output.write(f"# {comment}\n")
+            output.write(format_command(cmd, syntax))
+            if comment and syntax == 'compact':
+                output.write(f"  # {comment}")
+            output.write('\n')
+            count += 1
+    
+    return count
+
+def parse_assembly_language(text):
+    """Парсинг языка ассемблера"""
+    return list(iter_assembly_language(text.strip().splitlines()))
+
+def encode_command(cmd):
+    """Преобразование одной команды IR в 7 байт машинного кода"""
+    op = cmd[0]
+    
+    if op == 'load_const':
+        return create_command(19, {'address': cmd[1], 'constant': cmd[2]})
+    elif op == 'read':
+        return create_command(3, {'dst_addr': cmd[1], 'src_addr': cmd[2]})
+    elif op == 'write':
+        return create_command(20, {'src_addr': cmd[1], 'offset': cmd[2], 'base_addr': cmd[3]})
+    elif op == 'max':
+        return create_command(7, {'addr_b': cmd[1], 'addr_c': cmd[2], 'addr_d': cmd[3]})
+    return b''
+
+def ir_to_columns(IR):
+    """
+    Преобразование IR в столбцы (коды операций, поле 1, поле 2, поле 3)
+    """
+    opcodes = []
+    field1 = []
+    field2 = []
+    field3 = []
+    
+    for cmd in IR:
+        op_code = OP_CODES.get(cmd[0])
+        if op_code is None:
+            continue
+        opcodes.append(op_code)
+        field1.append(cmd[1])
+        field2.append(cmd[2])
+        field3.append(cmd[3] if len(cmd) > 3 else 0)
+    
+    return opcodes, field1, field2, field3
+
+def _field_tables():
+    """Маски и сдвиги полей, индексируемые кодом операции (как в create_command)"""
+    mask1 = np.zeros(32, dtype=np.int64)
+    mask2 = np.zeros(32, dtype=np.int64)
+    mask3 = np.zeros(32, dtype=np.int64)
+    shift3 = np.zeros(32, dtype=np.int64)
+    
+    for op_code, bits2, bits3, offset3 in ((19, 20, 0, 0), (3, 16, 0, 0),
+                                           (20, 5, 16, 26), (7, 16, 16, 37)):
+        mask1[op_code] = mask(16)
+        mask2[op_code] = mask(bits2)
+        mask3[op_code] = mask(bits3)
+        shift3[op_code] = offset3
+    
+    return mask1, mask2, mask3, shift3
+
+def _masked_column(values, bits):
+    """
+    Столбец int64, обрезанный до bits младших бит ещё в Python: большие
+    значения не переполняют int64, а нецелые вызывают TypeError, как в create_command
+    """
+    column_mask = mask(bits)
+    return np.fromiter((value & column_mask for value in values), dtype=np.int64, count=len(values))
+
+def encode_columns(opcodes, field1, field2, field3):
+    """
+    Пакетное кодирование столбцов IR векторными сдвигами NumPy.
+    Результат побайтно совпадает с create_command для каждой команды.
+    """
+    if not HAS_NUMPY:
+        raise RuntimeError("Для пакетного кодирования требуется установленный NumPy")
+    
+    # Поля обрезаются до наибольшей ширины, точная маска операции применяется ниже
+    op = _masked_column(opcodes, 5)
+    field1 = _masked_column(field1, 16)
+    field2 = _masked_column(field2, 20)
+    field3 = _masked_column(field3, 16)
+    mask1, mask2, mask3, shift3 = _field_tables()
+    
+    command = op.copy()
+    command |= (field1 & mask1[op]) << 5
+    command |= (field2 & mask2[op]) << 21
+    command |= (field3 & mask3[op]) << shift3[op]
+    
+    # 7 младших байт каждого little-endian слова
+    records = command.astype('<u8').view(np.uint8).reshape(-1, 8)
+    return records[:, :7].tobytes()
 
 def assemble_ir(IR):
     """Преобразование IR в машинный код"""
-    bytecode = bytes()
+    if HAS_NUMPY and len(IR) >= BULK_THRESHOLD:
+        return encode_columns(*ir_to_columns(IR))
+    return b''.join(encode_command(cmd) for cmd in IR)
+
+def assemble_stream(input_path, output_path, flush_size=1 << 20):
+    """
+    Потоковое ассемблирование: исходник читается построчно, машинный код
+    пишется в буферизованный файл. Память не зависит от размера программы.
+    Возвращает (количество команд, размер байткода).
+    """
+    count = 0
+    size = 0
+    batch = []
+    
+    with open(input_path, 'r', encoding='utf-8') as source, \
+         open(output_path, 'wb', buffering=flush_size) as output:
+        for cmd in iter_assembly_language(source):
+            batch.append(cmd)
+            
+            if len(batch) >= STREAM_BATCH:
+                size += output.write(assemble_ir(batch))
+                count += len(batch)
+                batch = []
+        
+        size += output.write(assemble_ir(batch))
+        count += len(batch)
+    
+    return count, size
+
+def split_source(path, chunk_size=PARALLEL_CHUNK_SIZE):
+    """
+    Разбиение исходника на фрагменты по границам строк.
+    Возвращает список (начало, конец) в байтах.
+    """
+    size = os.path.getsize(path)
+    bounds = []
+    start = 0
+    
+    with open(path, 'rb') as file:
+        while start < size:
+            end = start + chunk_size
+            if end >= size:
+                end = size
+            else:
+                file.seek(end)
+                file.readline()
+                end = file.tell()
+            bounds.append((start, end))
+            start = end
+    
+    return bounds
+
+def _assemble_chunk(path, start, end):
+    """
+    Ассемблирование одного фрагмента в рабочем процессе.
+    Возвращает (байткод, количество команд, количество строк, диагностика
+    с номерами строк относительно начала фрагмента).
+    """
+    with open(path, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode('utf-8')
+    
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    
+    diagnostics = []
+    IR = list(iter_assembly_language(lines, lambda *item: diagnostics.append(item)))
+    
+    return assemble_ir(IR), len(IR), text.count('\n'), diagnostics
+
+def assemble_parallel(input_path, output_path, jobs=None, chunk_size=PARALLEL_CHUNK_SIZE):
+    """
+    Параллельное ассемблирование: фрагменты исходника разбираются и кодируются
+    в пуле процессов, байткод склеивается в исходном порядке.
+    Диагностика выводится с глобальными номерами строк.
+    Возвращает (количество команд, размер байткода).
+    """
+    bounds = split_source(input_path, chunk_size)
+    count = 0
+    size = 0
+    line_offset = 0
+    
+    with ProcessPoolExecutor(max_workers=jobs) as pool, open(output_path, 'wb') as output:
+        results = pool.map(_assemble_chunk, [input_path] * len(bounds),
+                           [start for start, _ in bounds], [end for _, end in bounds])
+        
+        for bytecode, chunk_count, line_count, diagnostics in results:
+            for line_num, kind, detail in diagnostics:
+                print_diagnostic(line_offset + line_num, kind, detail)
+            
+            size += output.write(bytecode)
+            count += chunk_count
+            line_offset += line_count
+    
+    return count, size
+
+def iter_bytecode_file(path, chunk_commands=4096):
+    """Чтение команд из бинарного файла по 7 байт без загрузки файла целиком"""
+    with open(path, 'rb') as file:
+        while True:
+            chunk = file.read(7 * chunk_commands)
+            if not chunk:
+                break
+            for i in range(0, len(chunk), 7):
+                yield chunk[i:i+7]
+
+def _normalize_command(cmd):
+    """
+    Приведение команды IR к значениям полей, которые реально попадут в байткод.
+    Возвращает (команда, адрес записи, адреса чтения).
+    """
+    op = cmd[0]
+    
+    if op == 'load_const':
+        address = cmd[1] & mask(16)
+        return ('load_const', address, cmd[2] & mask(20)), address, ()
+    elif op == 'read':
+        dst_addr, src_addr = cmd[1] & mask(16), cmd[2] & mask(16)
+        return ('read', dst_addr, src_addr), dst_addr, (src_addr,)
+    elif op == 'write':
+        src_addr, offset, base_addr = cmd[1] & mask(16), cmd[2] & mask(5), cmd[3] & mask(16)
+        return ('write', src_addr, offset, base_addr), (base_addr + offset) & mask(16), (src_addr,)
+    elif op == 'max':
+        addr_b, addr_c, addr_d = cmd[1] & mask(16), cmd[2] & mask(16), cmd[3] & mask(16)
+        return ('max', addr_b, addr_c, addr_d), addr_c, (addr_b, addr_d)
+    
+    return cmd, None, None
+
+def _propagate_constants(IR, stats):
+    """
+    Распространение констант через read/write и свёртка max над известными значениями.
+    Начальное содержимое памяти считается неизвестным.
+    """
+    known = {}
+    result = []
     
     for cmd in IR:
+        cmd, target, sources = _normalize_command(cmd)
+        
+        if target is None:
+            # Неизвестная команда - барьер для анализа
+            known.clear()
+            result.append(cmd)
+            continue
+        
         op = cmd[0]
+        value = None
         
         if op == 'load_const':
-            bytecode += create_command(19, {'address': cmd[1], 'constant': cmd[2]})
-        elif op == 'read':
-            bytecode += create_command(3, {'dst_addr': cmd[1], 'src_addr': cmd[2]})
-        elif op == 'write':
-            bytecode += create_command(20, {'src_addr': cmd[1], 'offset': cmd[2], 'base_addr': cmd[3]})
-        elif op == 'max':
-            bytecode += create_command(7, {'addr_b': cmd[1], 'addr_c': cmd[2], 'addr_d': cmd[3]})
+            value = cmd[2]
+        elif all(src in known for src in sources):
+            value = max(known[src] for src in sources)
+        
+        if value is not None:
+            if known.get(target) == value:
+                # Ячейка уже содержит это значение
+                stats['redundant'] += 1
+                continue
+            
+            known[target] = value
+            
+            if op != 'load_const':
+                stats['folded'] += 1
+                cmd = ('load_const', target, value)
+            result.append(cmd)
+            continue
+        
+        known.pop(target, None)
+        
+        if op == 'max' and cmd[1] == cmd[3]:
+            # max(x, x) = x
+            cmd = ('read', target, cmd[1])
+            sources = (cmd[2],)
+        
+        if sources == (target,):
+            # Копирование ячейки в саму себя
+            stats['redundant'] += 1
+            continue
+        
+        result.append(cmd)
+    
+    return result
+
+def _eliminate_dead_stores(IR, stats):
+    """
+    Удаление записей, которые перезаписываются до любого чтения.
+    В конце программы вся память считается живой (итоговый образ памяти).
+    """
+    killed = set()
+    result = []
+    
+    for cmd in reversed(IR):
+        _, target, sources = _normalize_command(cmd)
+        
+        if target is None:
+            killed.clear()
+            result.append(cmd)
+            continue
+        
+        if target in killed:
+            stats['dead_stores'] += 1
+            continue
+        
+        killed.add(target)
+        killed.difference_update(sources)
+        result.append(cmd)
     
-    return bytecode
+    result.reverse()
+    return result
+
+def optimize_ir(IR):
+    """
+    Оптимизация IR: распространение констант, свёртка max и удаление мёртвых записей.
+    Итоговый образ памяти совпадает с неоптимизированной программой
+    при любом начальном содержимом памяти.
+    Возвращает (оптимизированный IR, статистика).
+    """
+    stats = {'input': len(IR), 'folded': 0, 'redundant': 0, 'dead_stores': 0}
+    
+    optimized = list(IR)
+    while True:
+        size = len(optimized)
+        optimized = _propagate_constants(optimized, stats)
+        optimized = _eliminate_dead_stores(optimized, stats)
+        if len(optimized) == size:
+            break
+    
+    stats['output'] = len(optimized)
+    stats['removed'] = stats['input'] - stats['output']
+    return optimized, stats
 
 def format_bytecode_exactly_like_spec(bytecode):
     """Форматирование байткода ТОЧНО как в спецификации"""
@@ -147,6 +598,25 @@ def display_test_results():
             print(f"    Ожидалось: {expected}")
             print(f"    Получено:  {formatted}")
     
+    # Пакетный кодировщик должен давать те же байты, что и create_command
+    if HAS_NUMPY:
+        columns = [[], [], [], []]
+        for _, op_code, fields, _ in tests:
+            values = list(fields.values()) + [0] * (3 - len(fields))
+            for column, value in zip(columns, [op_code] + values):
+                column.append(value)
+        
+        bulk = encode_columns(*columns)
+        reference = b''.join(create_command(op_code, fields) for _, op_code, fields, _ in tests)
+        
+        print(f"\nПакетный кодировщик NumPy:")
+        if bulk == reference:
+            print(f"  ✓ Совпадает с create_command")
+        else:
+            print(f"  ✗ Ошибка!")
+            print(f"    Ожидалось: {', '.join(f'0x{b:02X}' for b in reference)}")
+            print(f"    Получено:  {', '.join(f'0x{b:02X}' for b in bulk)}")
+    
     print("\n" + "="*60)
 
 def main():
@@ -156,6 +626,14 @@ def main():
     parser.add_argument('-t', '--test', action='store_true', help='Показать тестовые примеры')
     parser.add_argument('-v', '--verbose', action='store_true', help='Подробный вывод')
     parser.add_argument('--format', action='store_true', help='Вывод в формате спецификации')
+    parser.add_argument('-O', '--optimize', action='store_true',
+                        help='Оптимизация: свёртка констант и удаление мёртвых записей')
+    parser.add_argument('--convert', choices=('json', 'compact'),
+                        help='Преобразовать исходник -i в указанный синтаксис и записать в -o')
+    parser.add_argument('--cache', action='store_true',
+                        help='Использовать дисковый кеш ассемблирования (__uvmcache__ или $UVM_CACHE_DIR)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Параллельное ассемблирование больших исходников в N процессах')
     
     args = parser.parse_args()
     
@@ -164,38 +642,72 @@ def main():
         display_test_results()
         return
     
+    # Преобразование исходника между синтаксисами
+    if args.convert and args.input and args.output:
+        count = convert_source(args.input, args.output, args.convert)
+        print(f"✅ Преобразовано команд: {count} ({args.convert}) -> {args.output}")
+        return
+    
     # Если указаны input и output, выполняем ассемблирование
     if args.input and args.output:
-        with open(args.input, 'r', encoding='utf-8') as file:
-            text = file.read()
+        cache = None
+        if args.cache:
+            from uvm_cache import AssemblyCache, file_source_key
+            
+            cache = AssemblyCache()
+            cache_key = file_source_key(args.input, args.optimize)
         
-        IR = parse_assembly_language(text)
-        bytecode = assemble_ir(IR)
+        if cache is not None and cache.copy_bytecode_to(cache_key, args.output):
+            # Исходник не изменился: байткод берётся из кеша без разбора
+            size = os.path.getsize(args.output)
+            command_count = size // 7
+            print(f"\n♻  Байткод взят из кеша ({cache.cache_dir})")
+        elif args.optimize:
+            # Оптимизатору нужен весь IR программы
+            with open(args.input, 'r', encoding='utf-8') as file:
+                text = file.read()
+            
+            IR, stats = optimize_ir(parse_assembly_language(text))
+            print(f"\n🔧 Оптимизация: удалено {stats['removed']} из {stats['input']} команд")
+            print(f"   Свёрнуто в константы: {stats['folded']}")
+            print(f"   Избыточных записей: {stats['redundant']}")
+            print(f"   Мёртвых записей: {stats['dead_stores']}")
+            
+            bytecode = assemble_ir(IR)
+            
+            with open(args.output, 'wb') as output_file:
+                output_file.write(bytecode)
+            
+            command_count, size = len(IR), len(bytecode)
+        elif args.jobs and args.jobs > 1 and os.path.getsize(args.input) > PARALLEL_CHUNK_SIZE:
+            # Большой исходник разбирается фрагментами в пуле процессов
+            command_count, size = assemble_parallel(args.input, args.output, jobs=args.jobs)
+        else:
+            # Потоковое ассемблирование: память не зависит от размера исходника
+            command_count, size = assemble_stream(args.input, args.output)
         
-        with open(args.output, 'wb') as output_file:
-            output_file.write(bytecode)
+        if cache is not None and not cache.hits:
+            cache.put_bytecode_file(cache_key, args.output)
         
         print(f"\n✅ Ассемблирование завершено!")
         print(f"📊 Статистика:")
-        print(f"   Количество команд: {len(IR)}")
-        print(f"   Размер бинарного файла: {len(bytecode)} байт")
+        print(f"   Количество команд: {command_count}")
+        print(f"   Размер бинарного файла: {size} байт")
         
         # Вывод в формате спецификации (если указан флаг или verbose)
         if args.format or args.verbose:
             print(f"\n🎯 Результат ассемблирования в формате спецификации:")
             print("="*70)
             
-            formatted_lines = format_bytecode_exactly_like_spec(bytecode)
-            
-            for i, line in enumerate(formatted_lines):
-                print(f"Команда {i}: {line}")
+            for i, chunk in enumerate(iter_bytecode_file(args.output)):
+                print(f"Команда {i}: {format_bytecode_exactly_like_spec(chunk)[0]}")
             
             print("="*70)
             
         # Если не verbose, показываем только одну команду для примера
-        elif len(IR) > 0:
+        elif command_count > 0:
             print(f"\n📝 Пример вывода (первая команда):")
-            first_chunk = bytecode[0:7]
+            first_chunk = next(iter_bytecode_file(args.output, chunk_commands=1))
             hex_bytes = [f"0x{b:02X}" for b in first_chunk]
             formatted = ", ".join(hex_bytes)
             print(f"  {formatted}")
@@ -206,6 +718,9 @@ def main():
         print("  python uvm_asm.py -t                         # Показать тестовые примеры")
         print("  python uvm_asm.py -i input.uvm -o output.bin # Ассемблировать программу")
         print("  python uvm_asm.py -i input.uvm -o output.bin -v --format # Подробный вывод в формате спецификации")
+        print("  python uvm_asm.py -i input.uvm -o output.bin -O # Ассемблировать с оптимизацией")
+        print("  python uvm_asm.py -i input.uvm -o output.bin -j 8 # Параллельное ассемблирование")
+        print("  python uvm_asm.py -i input.uvm -o compact.uvm --convert compact # Компактный синтаксис")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Пакетное выполнение множества программ УВМ в пуле процессов
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from uvm_cache import AssemblyCache
+from uvm_interp import OP_MAX, fuse_program, parse_address_ranges, predecode, run_fused
+from uvm_memory import ADDRESS_SPACE, allocate_memory
+
+# Количество предекодированных программ, хранимых в каждом рабочем процессе
+DECODED_CACHE_SIZE = 256
+
+# Кеш предекодированных программ рабочего процесса:
+# хеш байткода -> (DecodedProgram, программа после fuse_program).
+# Пул переиспользует процессы, поэтому одинаковый байткод декодируется
+# не более одного раза на процесс.
+_decoded_cache = OrderedDict()
+
+def collect_programs(source):
+    """
+    Список бинарных файлов для пакетного запуска.
+
+    source - каталог (берутся все *.bin) или файл-манифест
+    (по одному пути в строке, пути относительно манифеста, # - комментарий)
+    """
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, name) for name in os.listdir(source)
+                      if name.endswith('.bin'))
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, 'r', encoding='utf-8') as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            paths.append(os.path.join(base_dir, line))
+    return paths
+
+def _get_decoded(bytecode, cache_dir=None):
+    """Предекодированная программа из кеша процесса (или дискового кеша uvm_cache)"""
+    key = hashlib.sha256(bytecode).hexdigest()
+
+    entry = _decoded_cache.get(key)
+    if entry is None:
+        if cache_dir:
+            program = AssemblyCache(cache_dir).predecoded(bytecode)
+        else:
+            program = predecode(bytecode)
+        entry = (program, fuse_program(program))
+        _decoded_cache[key] = entry
+        if len(_decoded_cache) > DECODED_CACHE_SIZE:
+            _decoded_cache.popitem(last=False)
+    else:
+        _decoded_cache.move_to_end(key)
+
+    return key, entry
+
+def run_job(path, data_memory_size=ADDRESS_SPACE, ranges=(), memory='list', word_bits=32, cache_dir=None):
+    """
+    Выполнение одной программы в рабочем процессе.
+    Возвращает словарь с результатами, пригодный для сериализации в JSON.
+    """
+    result = {'path': path}
+
+    try:
+        start = time.perf_counter()
+        with open(path, 'rb') as file:
+            bytecode = file.read()
+
+        digest, (program, fused) = _get_decoded(bytecode, cache_dir)
+        data_memory = allocate_memory(data_memory_size, memory, word_bits)
+        run_fused(fused, data_memory)
+
+        result['digest'] = digest
+        result['instructions'] = len(program)
+        result['max_operations'] = program.opcodes.count(OP_MAX)
+        result['elapsed'] = time.perf_counter() - start
+        result['ranges'] = {
+            f"{first}-{last}": [int(value) for value in data_memory[max(0, first):last + 1]]
+            for first, last in ranges
+        }
+    except Exception as e:
+        result['error'] = str(e)
+
+    return result
+
+def execute_many(paths, data_memory_size=ADDRESS_SPACE, ranges=(), jobs=None, memory='list', word_bits=32,
+                 cache_dir=None):
+    """
+    Выполнение программ в пуле процессов.
+    Генератор: результаты возвращаются по мере завершения заданий.
+    cache_dir - каталог дискового кеша предекодированных программ (uvm_cache)
+    """
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(run_job, path, data_memory_size, ranges, memory, word_bits, cache_dir)
+                   for path in paths]
+
+        for future in as_completed(futures):
+            yield future.result()
+
+def run_batch(source, output=None, addr_range=None, jobs=None, data_memory_size=ADDRESS_SPACE,
+              memory='list', word_bits=32, cache_dir=None):
+    """Пакетный режим командной строки: результаты пишутся в JSON lines"""
+    paths = collect_programs(source)
+    ranges = parse_address_ranges(addr_range) if addr_range else ()
+
+    print(f"📦 Программ для выполнения: {len(paths)}")
+
+    out = open(output, 'w', encoding='utf-8') if output else None
+    completed = 0
+    failed = 0
+    instructions = 0
+    start = time.perf_counter()
+
+    try:
+        for result in execute_many(paths, data_memory_size, ranges, jobs, memory, word_bits, cache_dir):
+            completed += 1
+            if 'error' in result:
+                failed += 1
+                print(f"❌ {result['path']}: {result['error']}")
+            else:
+                instructions += result['instructions']
+
+            if out:
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if out:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+
+    print(f"\n📊 Статистика пакетного выполнения:")
+    print(f"   Выполнено программ: {completed - failed} из {completed}")
+    print(f"   Всего команд: {instructions}")
+    print(f"   Время: {elapsed:.3f} с")
+    if output:
+        print(f"   Результаты сохранены в {output}")
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Замеры производительности интерпретатора Учебной Виртуальной Машины (УВМ)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+
+from uvm_asm import assemble_ir, assemble_stream, format_command
+from uvm_codegen import compile_program
+from uvm_interp import (STREAM_WINDOW, execute_lanes, execute_stream, fuse_program,
+                        interpret_bytecode, open_bytecode, predecode, run_decoded, run_fused,
+                        save_xml_dump)
+from uvm_memory import HAS_NUMPY, np
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    resource = None
+    HAS_RESOURCE = False
+
+# Размеры программ набора замеров по умолчанию (допустимы значения до 1e7)
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# Допустимое замедление относительно базового замера (доля)
+DEFAULT_TOLERANCE = 0.2
+
+# Этапы короче этого времени (с) не сравниваются с базой: слишком велик шум
+MIN_COMPARABLE_TIME = 0.01
+
+# Этапы, выделяющие меньше этого объёма (байт), не сравниваются по памяти
+MIN_COMPARABLE_ALLOC = 64 << 10
+
+# Этапы конвейера в порядке выполнения
+STAGES = ('assemble', 'decode', 'execute', 'dump')
+
+def iter_random_ir(memory_size=4096, seed=0):
+    """Бесконечный поток случайных команд всех видов"""
+    rng = random.Random(seed)
+
+    while True:
+        kind = rng.randrange(4)
+
+        if kind == 0:
+            yield ('load_const', rng.randrange(memory_size), rng.randrange(1 << 20))
+        elif kind == 1:
+            yield ('read', rng.randrange(memory_size), rng.randrange(memory_size))
+        elif kind == 2:
+            yield ('write', rng.randrange(memory_size), rng.randrange(32), rng.randrange(memory_size - 32))
+        else:
+            yield ('max', rng.randrange(memory_size), rng.randrange(memory_size), rng.randrange(memory_size))
+
+def iter_vector_ir(length=64, memory_size=4096, seed=0):
+    """
+    Программа в стиле create_test_program_max_vectors: два вектора констант,
+    поэлементный max и цепочка max для поиска общего максимума
+    """
+    rng = random.Random(seed)
+    base = 0
+
+    while True:
+        if base + 5 * length > memory_size:
+            base = 0
+        vector_a, vector_b, result, chain = base, base + length, base + 2 * length, base + 3 * length
+
+        for i in range(length):
+            yield ('load_const', vector_a + i, rng.randrange(1 << 20))
+        for i in range(length):
+            yield ('load_const', vector_b + i, rng.randrange(1 << 20))
+        for i in range(length):
+            yield ('max', vector_a + i, result + i, vector_b + i)
+
+        yield ('max', result, chain, result + 1)
+        for i in range(2, length):
+            yield ('max', chain + i - 2, chain + i - 1, result + i)
+
+        base += 5 * length
+
+def iter_matrix_ir(size=16, memory_size=4096, seed=0):
+    """
+    Матрицы size×size: загрузка A и B, поэлементный max в C,
+    максимум каждой строки C цепочкой max и копирование максимумов
+    строк в выходной вектор командой write
+    """
+    rng = random.Random(seed)
+    cells = size * size
+    block = 3 * cells + size * size + size
+    base = 0
+
+    while True:
+        if base + block > memory_size:
+            base = 0
+        matrix_a, matrix_b, matrix_c = base, base + cells, base + 2 * cells
+        chains, output = base + 3 * cells, base + 3 * cells + size * size
+
+        for i in range(cells):
+            yield ('load_const', matrix_a + i, rng.randrange(1 << 20))
+        for i in range(cells):
+            yield ('load_const', matrix_b + i, rng.randrange(1 << 20))
+        for i in range(cells):
+            yield ('max', matrix_a + i, matrix_c + i, matrix_b + i)
+
+        for row in range(size):
+            first = matrix_c + row * size
+            chain = chains + row * size
+            yield ('read', chain, first)
+            for col in range(1, size):
+                yield ('max', chain + col - 1, chain + col, first + col)
+            yield ('write', chain + size - 1, row % 32, output + row - row % 32)
+
+        base += block
+
+def iter_timeseries_ir(window=32, memory_size=4096, seed=0):
+    """
+    Временной ряд: отсчёты поступают окнами по window значений;
+    для каждого окна считается нарастающий максимум, а итог окна
+    записывается в кольцевой буфер результатов
+    """
+    rng = random.Random(seed)
+    block = 2 * window
+    history = 32
+    results = memory_size - history
+    base = 0
+    level = 1 << 19
+    step = 0
+
+    while True:
+        if base + block > results:
+            base = 0
+        samples, running = base, base + window
+
+        for i in range(window):
+            level = min((1 << 20) - 1, max(0, level + rng.randrange(-4096, 4097)))
+            yield ('load_const', samples + i, level)
+
+        yield ('read', running, samples)
+        for i in range(1, window):
+            yield ('max', running + i - 1, running + i, samples + i)
+        yield ('write', running + window - 1, step % history, results)
+
+        base += block
+        step += 1
+
+# Генераторы тестовых нагрузок: бесконечные потоки команд
+WORKLOADS = {
+    'vector': iter_vector_ir,
+    'matrix': iter_matrix_ir,
+    'timeseries': iter_timeseries_ir,
+    'random': iter_random_ir,
+}
+
+def generate_workload_ir(workload, count, memory_size=4096, seed=0):
+    """Программа из count команд указанного вида нагрузки"""
+    return list(islice(WORKLOADS[workload](memory_size=memory_size, seed=seed), count))
+
+def generate_random_ir(count, memory_size=4096, seed=0):
+    """Генерация случайной программы из count команд"""
+    return list(islice(iter_random_ir(memory_size, seed), count))
+
+def generate_vector_ir(count, length=64, memory_size=4096):
+    """Векторная программа из count команд (см. iter_vector_ir)"""
+    return list(islice(iter_vector_ir(length, memory_size), count))
+
+def benchmark_fusion(count, memory_size=4096):
+    """Сравнение исполнения таблицей с суперкомандами и без них"""
+    program = predecode(assemble_ir(generate_vector_ir(count, memory_size=memory_size)))
+
+    plain_memory = [0] * memory_size
+    start = time.perf_counter()
+    run_decoded(program, plain_memory)
+    plain_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fused = fuse_program(program)
+    fuse_time = time.perf_counter() - start
+
+    fused_memory = [0] * memory_size
+    start = time.perf_counter()
+    run_fused(fused, fused_memory)
+    fused_time = time.perf_counter() - start
+
+    if fused_memory != plain_memory:
+        raise RuntimeError("Результаты исполнения с суперкомандами не совпадают")
+
+    return {'instructions': count, 'fused_instructions': len(fused),
+            'plain': plain_time, 'fuse': fuse_time, 'fused': fused_time}
+
+def benchmark_dispatch(count, memory_size=4096):
+    """Сравнение эталонного цикла и предекодированного исполнения"""
+    bytecode = assemble_ir(generate_random_ir(count, memory_size))
+
+    reference_memory = [0] * memory_size
+    start = time.perf_counter()
+    interpret_bytecode(bytecode, reference_memory)
+    reference_time = time.perf_counter() - start
+
+    decoded_memory = [0] * memory_size
+    start = time.perf_counter()
+    program = predecode(bytecode)
+    decode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    run_decoded(program, decoded_memory)
+    run_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = compile_program(bytecode)
+    compile_time = time.perf_counter() - start
+
+    compiled_memory = [0] * memory_size
+    start = time.perf_counter()
+    compiled(compiled_memory)
+    compiled_time = time.perf_counter() - start
+
+    if decoded_memory != reference_memory or compiled_memory != reference_memory:
+        raise RuntimeError("Результаты исполнения не совпадают с эталоном")
+
+    return {
+        'instructions': count,
+        'reference': reference_time,
+        'predecode': decode_time,
+        'execute': run_time,
+        'compile': compile_time,
+        'compiled': compiled_time,
+    }
+
+def benchmark_lanes(count, lanes, memory_size=4096):
+    """Сравнение поочерёдного и векторного выполнения над lanes образами памяти"""
+    bytecode = assemble_ir(generate_random_ir(count, memory_size))
+    program = predecode(bytecode)
+    initial = np.random.default_rng(0).integers(0, 1 << 20, size=(lanes, memory_size))
+
+    sequential = [initial[lane].tolist() for lane in range(lanes)]
+    start = time.perf_counter()
+    for lane_memory in sequential:
+        run_decoded(program, lane_memory)
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = execute_lanes(program, initial)
+    lanes_time = time.perf_counter() - start
+
+    if result.tolist() != sequential:
+        raise RuntimeError("Результаты векторного выполнения не совпадают с поочерёдным")
+
+    return {'instructions': count, 'lanes': lanes,
+            'sequential': sequential_time, 'vectorized': lanes_time}
+
+def benchmark_resume(count, memory_size=4096):
+    """
+    Продолжение потокового выполнения с контрольной точки: точка ставится
+    на команде, не кратной окну, результат сверяется с полным выполнением
+    """
+    from uvm_checkpoint import Checkpointer, program_fingerprint
+
+    bytecode = assemble_ir(generate_random_ir(count, memory_size))
+    program = predecode(bytecode)
+    fingerprint = program_fingerprint(bytecode)
+    position = STREAM_WINDOW + 1 if count > STREAM_WINDOW else count // 3 + 1
+
+    reference_memory = [0] * memory_size
+    run_decoded(program, reference_memory)
+
+    with tempfile.TemporaryDirectory(prefix='uvm_bench_') as workdir:
+        binary = os.path.join(workdir, 'program.bin')
+        with open(binary, 'wb') as f:
+            f.write(bytecode)
+
+        partial_memory = [0] * memory_size
+        run_decoded(program.slice(0, position), partial_memory)
+        start = time.perf_counter()
+        Checkpointer(workdir, fingerprint).save(position, partial_memory)
+        save_time = time.perf_counter() - start
+
+        resumed_memory = [0] * memory_size
+        start = time.perf_counter()
+        execute_stream(binary, resumed_memory,
+                       checkpoint=Checkpointer(workdir, fingerprint, resume=True))
+        resume_time = time.perf_counter() - start
+
+    if resumed_memory != reference_memory:
+        raise RuntimeError("Результат продолжения с контрольной точки не совпадает с эталоном")
+
+    return {'instructions': count, 'position': position, 'save': save_time, 'resume': resume_time}
+
+def write_workload_source(workload, count, path, memory_size=4096, syntax='json'):
+    """Запись исходника нагрузки в файл построчно (без хранения программы целиком)"""
+    with open(path, 'w', encoding='utf-8') as source:
+        for cmd in islice(WORKLOADS[workload](memory_size=memory_size), count):
+            source.write(format_command(cmd, syntax) + "\n")
+
+def peak_rss():
+    """Пиковый RSS процесса в байтах (None, если недоступен)"""
+    if not HAS_RESOURCE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux сообщает килобайты, macOS - байты
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def _run_stages(source, count, workdir, memory_size, measure):
+    """
+    Этапы конвейера над исходником source из count команд;
+    measure(name, units, func) выполняет этап и записывает замер.
+    Возвращает (путь к байткоду, память после исполнения).
+    """
+    binary = os.path.join(workdir, 'program.bin')
+    dump = os.path.join(workdir, 'dump.xml')
+
+    measure('assemble', count, lambda: assemble_stream(source, binary))
+    with open_bytecode(binary) as bytecode:
+        program = measure('decode', count, lambda: predecode(bytecode))
+
+    data_memory = [0] * memory_size
+    measure('execute', count, lambda: run_decoded(program, data_memory))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        measure('dump', memory_size,
+                lambda: save_xml_dump(data_memory, dump, f"0-{memory_size - 1}"))
+    return binary, data_memory
+
+def benchmark_pipeline(workload, count, memory_size=4096, trace_memory=True, syntax='json'):
+    """
+    Замер этапов ассемблирование -> декодирование -> исполнение -> дамп
+    для программы из count команд.
+
+    Для каждого этапа сохраняются время и пропускная способность (команд/с,
+    для дампа - ячеек/с). При trace_memory конвейер повторяется под
+    tracemalloc и для каждого этапа сохраняется пик его собственных
+    выделений Python; время при этом замеряется только в первом проходе.
+    """
+    stages = {name: {} for name in STAGES}
+
+    def timed(name, units, func):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+
+        stages[name].update(time=elapsed, throughput=units / elapsed if elapsed else None)
+        return result
+
+    def traced(name, units, func):
+        tracemalloc.start()
+        try:
+            return func()
+        finally:
+            stages[name]['peak_alloc'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    with tempfile.TemporaryDirectory(prefix='uvm_bench_') as workdir:
+        source = os.path.join(workdir, 'program.uvm')
+        write_workload_source(workload, count, source, memory_size, syntax)
+
+        binary, data_memory = _run_stages(source, count, workdir, memory_size, timed)
+
+        reference_memory = [0] * memory_size
+        with open_bytecode(binary) as bytecode:
+            interpret_bytecode(bytecode, reference_memory)
+        if data_memory != reference_memory:
+            raise RuntimeError(f"Результаты исполнения нагрузки {workload} не совпадают с эталоном")
+
+        if trace_memory:
+            _run_stages(source, count, workdir, memory_size, traced)
+
+    return {'workload': workload, 'instructions': count, 'stages': stages}
+
+def run_suite(workloads, sizes, memory_size=4096, trace_memory=True, syntax='json'):
+    """Набор замеров: все сочетания нагрузок и размеров"""
+    results = []
+
+    for workload in workloads:
+        for count in sizes:
+            result = benchmark_pipeline(workload, count, memory_size, trace_memory, syntax)
+            print_pipeline_result(result)
+            results.append(result)
+
+    return {
+        'python': sys.version.split()[0],
+        'memory_size': memory_size,
+        'results': results,
+        # Пиковый RSS всего набора (ru_maxrss не убывает, поэтому не по размерам)
+        'peak_rss': peak_rss(),
+    }
+
+def print_pipeline_result(result):
+    stages = '  '.join(f"{name} {result['stages'][name]['time']:.3f} с" for name in STAGES)
+    print(f"   {result['workload']:<10} {result['instructions']:>9}: {stages}")
+
+def compare_with_baseline(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Сравнение замеров с базовыми. Возвращает список описаний регрессий:
+    этап медленнее базового более чем на tolerance (или выделяет больше памяти).
+    """
+    reference = {(entry['workload'], entry['instructions']): entry for entry in baseline['results']}
+    regressions = []
+
+    for result in report['results']:
+        base = reference.get((result['workload'], result['instructions']))
+        if base is None:
+            continue
+
+        for name, stage in result['stages'].items():
+            base_stage = base['stages'].get(name)
+            if base_stage is None:
+                continue
+
+            label = f"{result['workload']}/{result['instructions']}/{name}"
+            if (base_stage['time'] >= MIN_COMPARABLE_TIME and
+                    stage['time'] > base_stage['time'] * (1 + tolerance)):
+                regressions.append(f"{label}: время {stage['time']:.3f} с "
+                                   f"(база {base_stage['time']:.3f} с)")
+            if ('peak_alloc' in stage and 'peak_alloc' in base_stage and
+                    base_stage['peak_alloc'] >= MIN_COMPARABLE_ALLOC and
+                    stage['peak_alloc'] > base_stage['peak_alloc'] * (1 + tolerance)):
+                regressions.append(f"{label}: память {stage['peak_alloc']} байт "
+                                   f"(база {base_stage['peak_alloc']} байт)")
+
+    return regressions
+
+def parse_sizes(text):
+    """Разбор списка размеров вида "1e3,1e4,250000" """
+    return [int(float(part)) for part in text.split(',') if part.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description='Замеры производительности УВМ')
+    parser.add_argument('-n', '--count', type=int, default=1_000_000,
+                       help='Количество команд в тестовой программе')
+    parser.add_argument('--lanes', type=int, default=0,
+                       help='Дополнительно сравнить векторное выполнение над N образами памяти (NumPy)')
+    parser.add_argument('--suite', action='store_true',
+                       help='Набор замеров по этапам (ассемблирование, декодирование, исполнение, дамп)')
+    parser.add_argument('--workloads', default=','.join(WORKLOADS),
+                       help=f"Нагрузки набора через запятую ({', '.join(WORKLOADS)})")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                       help='Размеры программ через запятую, например 1e3,1e4,1e5,1e6,1e7')
+    parser.add_argument('--syntax', choices=('json', 'compact'), default='json',
+                       help='Синтаксис исходника для этапа ассемблирования')
+    parser.add_argument('--no-tracemalloc', dest='trace_memory', action='store_false',
+                       help='Не замерять пик выделений памяти этапов (без повторного прохода под tracemalloc)')
+    parser.add_argument('-o', '--output', required=False,
+                       help='Сохранить результаты набора в JSON (пригоден как базовый)')
+    parser.add_argument('--baseline', required=False,
+                       help='Базовый JSON: при регрессии код завершения 1')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                       help='Допустимое замедление относительно базы (доля, по умолчанию 0.2)')
+
+    args = parser.parse_args()
+
+    if args.suite:
+        workloads = [name.strip() for name in args.workloads.split(',') if name.strip()]
+        unknown = [name for name in workloads if name not in WORKLOADS]
+        if unknown:
+            parser.error(f"неизвестные нагрузки: {', '.join(unknown)}")
+
+        if args.baseline and not args.trace_memory:
+            parser.error("--baseline сравнивает и память этапов, --no-tracemalloc недопустим")
+
+        print(f"⏱  Набор замеров: {', '.join(workloads)}")
+        report = run_suite(workloads, parse_sizes(args.sizes), trace_memory=args.trace_memory,
+                           syntax=args.syntax)
+
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"✅ Результаты сохранены в {args.output}")
+
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            regressions = compare_with_baseline(report, baseline, args.tolerance)
+            if regressions:
+                print(f"❌ Регрессии относительно {args.baseline}:")
+                for line in regressions:
+                    print(f"   {line}")
+                sys.exit(1)
+            print(f"✅ Регрессий относительно {args.baseline} нет")
+        return
+
+    print(f"⏱  Программа из {args.count} случайных команд")
+    result = benchmark_dispatch(args.count)
+
+    predecoded_total = result['predecode'] + result['execute']
+    print(f"   Эталонный цикл:     {result['reference']:.3f} с")
+    print(f"   Предекодирование:   {result['predecode']:.3f} с")
+    print(f"   Исполнение таблицей: {result['execute']:.3f} с")
+    print(f"   Ускорение (всего):  x{result['reference'] / predecoded_total:.2f}")
+    print(f"   Ускорение (повторный запуск): x{result['reference'] / result['execute']:.2f}")
+    print(f"   Компиляция в Python: {result['compile']:.3f} с")
+    print(f"   Исполнение скомпилированной: {result['compiled']:.3f} с")
+    print(f"   Ускорение (скомпилированная, повторный запуск): x{result['reference'] / result['compiled']:.2f}")
+
+    fusion = benchmark_fusion(args.count)
+    print(f"\n⏱  Векторная программа: {fusion['instructions']} команд -> "
+          f"{fusion['fused_instructions']} после слияния")
+    print(f"   Без суперкоманд: {fusion['plain']:.3f} с")
+    print(f"   Слияние:         {fusion['fuse']:.3f} с")
+    print(f"   С суперкомандами: {fusion['fused']:.3f} с")
+    print(f"   Ускорение (со слиянием): x{fusion['plain'] / (fusion['fuse'] + fusion['fused']):.2f}")
+    print(f"   Ускорение (повторный запуск): x{fusion['plain'] / fusion['fused']:.2f}")
+
+    resume = benchmark_resume(args.count)
+    print(f"\n⏱  Продолжение с контрольной точки на команде {resume['position']}")
+    print(f"   Запись точки:    {resume['save']:.3f} с")
+    print(f"   Продолжение (--stream): {resume['resume']:.3f} с")
+
+    if args.lanes:
+        if not HAS_NUMPY:
+            print("⚠  Векторное выполнение требует NumPy, замер пропущен")
+            return
+
+        lanes = benchmark_lanes(args.count, args.lanes)
+        print(f"\n⏱  Векторное выполнение над {lanes['lanes']} образами памяти")
+        print(f"   Поочерёдно:  {lanes['sequential']:.3f} с")
+        print(f"   Векторно:    {lanes['vectorized']:.3f} с")
+        print(f"   Ускорение:   x{lanes['sequential'] / lanes['vectorized']:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Точки останова и точки наблюдения за памятью для программ УВМ.
+
+Программа УВМ не содержит переходов, поэтому заранее известно, какие
+команды обращаются к наблюдаемым адресам. Перед выполнением строится
+побайтовая карта остановок (bytearray, по байту на команду): 1 - команда
+является точкой останова или читает/пишет наблюдаемую ячейку. Между
+остановками программа выполняется обычным предекодированным
+движком, а следующая остановка находится методом bytearray.find.
+"""
+
+from collections import namedtuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+from uvm_interp import OP_LOAD_CONST, OP_MAX, OP_NAMES, _HANDLERS, run_decoded
+from uvm_memory import ADDRESS_SPACE
+
+# Точка наблюдения: диапазон адресов [start, end] и виды обращений
+Watchpoint = namedtuple('Watchpoint', 'start end read write')
+
+# Событие остановки на команде index.
+# reason: 'break', 'read' или 'write'; для наблюдения - адрес и значения
+# ячейки до и после выполнения команды
+StopEvent = namedtuple('StopEvent', 'index reason address old new')
+
+_WATCH_KINDS = {'r': (True, False), 'w': (False, True), 'rw': (True, True)}
+
+# Операции, читающие память через src1 и src2
+_READS_SRC1 = bytes(1 if op in OP_NAMES and op != OP_LOAD_CONST else 0 for op in range(256))
+_READS_SRC2 = bytes(1 if op == OP_MAX else 0 for op in range(256))
+# Операции, пишущие в dst
+_WRITES_DST = bytes(1 if op in OP_NAMES else 0 for op in range(256))
+
+def parse_breakpoints(spec):
+    """Разбор номеров команд вида "10,200,3000" в множество"""
+    return {int(part) for part in spec.split(',') if part.strip()}
+
+def parse_watchpoints(spec):
+    """
+    Разбор точек наблюдения вида "500-511:w,600:r,700-703".
+    Вид обращения: r - чтение, w - запись, rw - любое (по умолчанию).
+    """
+    watchpoints = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+
+        addresses, _, kind = part.partition(':')
+        kind = kind or 'rw'
+        if kind not in _WATCH_KINDS:
+            raise ValueError(f"Неизвестный вид наблюдения '{kind}' (допустимо: r, w, rw)")
+
+        if '-' in addresses:
+            start, end = map(int, addresses.split('-'))
+        else:
+            start = end = int(addresses)
+        if end < start:
+            raise ValueError(f"Пустой диапазон наблюдения: {addresses}")
+
+        watchpoints.append(Watchpoint(start, end, *_WATCH_KINDS[kind]))
+    return watchpoints
+
+def _address_mask(watchpoints, size, kind):
+    mask = bytearray(size)
+    for watch in watchpoints:
+        if getattr(watch, kind) and watch.start < size:
+            end = min(watch.end, size - 1)
+            mask[watch.start:end + 1] = b'\x01' * (end - watch.start + 1)
+    return mask
+
+def _column_hits(column, mask):
+    """Байт на команду: 1, если адрес из столбца отмечен в маске"""
+    if HAS_NUMPY:
+        # Векторная выборка из маски по всему столбцу
+        addresses = np.frombuffer(column, dtype=column.typecode)
+        mask = np.frombuffer(mask, dtype=np.uint8)
+        if len(addresses) and addresses.max() >= len(mask):
+            mask = np.concatenate([mask, np.zeros(addresses.max() + 1 - len(mask), dtype=np.uint8)])
+        return int.from_bytes(mask[addresses].tobytes(), 'little')
+
+    top = max(column, default=0)
+    if top >= len(mask):
+        mask = mask + bytes(top + 1 - len(mask))
+    return int.from_bytes(bytes(map(mask.__getitem__, column)), 'little')
+
+def _flags(table, opcodes):
+    return int.from_bytes(opcodes.tobytes().translate(table), 'little')
+
+def stop_bitmap(program, breakpoints=(), watchpoints=()):
+    """
+    Карта остановок предекодированной программы: bytearray по байту на
+    команду, 1 - перед командой нужно остановиться.
+    Строится проходами по столбцам программы без цикла на Python
+    (с NumPy - векторной выборкой).
+    """
+    count = len(program)
+    stops = 0
+
+    if watchpoints:
+        reads = _address_mask(watchpoints, ADDRESS_SPACE, 'read')
+        writes = _address_mask(watchpoints, ADDRESS_SPACE, 'write')
+        if any(reads):
+            stops |= _column_hits(program.src1, reads) & _flags(_READS_SRC1, program.opcodes)
+            stops |= _column_hits(program.src2, reads) & _flags(_READS_SRC2, program.opcodes)
+        if any(writes):
+            stops |= _column_hits(program.dst, writes) & _flags(_WRITES_DST, program.opcodes)
+
+    bitmap = bytearray(stops.to_bytes(count, 'little'))
+    for index in breakpoints:
+        if 0 <= index < count:
+            bitmap[index] = 1
+    return bitmap
+
+def _watched(watchpoints, address, kind):
+    return any(getattr(watch, kind) and watch.start <= address <= watch.end
+               for watch in watchpoints)
+
+def _stop_events(program, memory, index, breakpoints, watchpoints):
+    """События остановки на команде index (значения new заполняются после её выполнения)"""
+    events = []
+    if index in breakpoints:
+        events.append(StopEvent(index, 'break', None, None, None))
+
+    op = program.opcodes[index]
+    if op not in OP_NAMES:
+        return events
+
+    if op != OP_LOAD_CONST:
+        sources = (program.src1[index], program.src2[index]) if op == OP_MAX else (program.src1[index],)
+        for address in dict.fromkeys(sources):
+            if _watched(watchpoints, address, 'read'):
+                events.append(StopEvent(index, 'read', address, memory[address], memory[address]))
+
+    address = program.dst[index]
+    if _watched(watchpoints, address, 'write'):
+        events.append(StopEvent(index, 'write', address, memory[address], None))
+    return events
+
+def format_stop(program, event):
+    """Строка описания события остановки"""
+    from uvm_debug import describe_instruction
+
+    instruction = describe_instruction(program, event.index)
+    if event.reason == 'break':
+        return f"⛔ Точка останова {instruction}"
+    if event.reason == 'read':
+        return f"👁  Чтение memory[{event.address}] = {event.old}: {instruction}"
+    return f"👁  Запись memory[{event.address}]: {event.old} -> {event.new}: {instruction}"
+
+def print_stop(program, event):
+    print(format_stop(program, event))
+
+def run_with_stops(program, data_memory, breakpoints=(), watchpoints=(), on_stop=None):
+    """
+    Выполнение предекодированной программы с точками останова и наблюдения.
+
+    Между остановками работает обычный предекодированный движок, команда
+    остановки выполняется отдельно. on_stop(event) вызывается для точки
+    останова до выполнения команды, для наблюдения - после. Если on_stop
+    возвращает False, выполнение прекращается (перед командой точки
+    останова или после наблюдаемой команды).
+    Возвращает количество выполненных команд.
+    """
+    if on_stop is None:
+        on_stop = lambda event: print_stop(program, event)
+
+    breakpoints = set(breakpoints)
+    count = len(program)
+    if not breakpoints and not watchpoints:
+        run_decoded(program, data_memory)
+        return count
+
+    bitmap = stop_bitmap(program, breakpoints, watchpoints)
+    ip = 0
+    while ip < count:
+        index = bitmap.find(1, ip)
+        if index < 0:
+            index = count
+        if index > ip:
+            run_decoded(program.slice(ip, index), data_memory)
+            ip = index
+        if index == count:
+            break
+
+        # Точка останова сообщается до выполнения команды, наблюдение - после
+        events = _stop_events(program, data_memory, index, breakpoints, watchpoints)
+        if events and events[0].reason == 'break':
+            if on_stop(events.pop(0)) is False:
+                return index
+
+        _HANDLERS[program.opcodes[index]](data_memory, program.dst[index],
+                                          program.src1[index], program.src2[index])
+        ip = index + 1
+
+        proceed = True
+        for event in events:
+            if event.reason == 'write':
+                event = event._replace(new=data_memory[event.address])
+            if on_stop(event) is False:
+                proceed = False
+        if not proceed:
+            break
+
+    return ip
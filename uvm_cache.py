@@ -0,0 +1,245 @@
+"""
+Дисковый кеш ассемблирования УВМ с адресацией по содержимому (аналог __pycache__).
+
+Ключ байткода - хеш нормализованного текста исходника, версии ассемблера и режима оптимизации.
+Ключ предекодированной программы - хеш самого байткода. Старые записи
+вытесняются по LRU (время последнего обращения = mtime файла), когда
+суммарный размер кеша превышает ограничение.
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+
+from uvm_asm import ASSEMBLER_VERSION, assemble_ir, optimize_ir, parse_assembly_language
+from uvm_interp import DecodedProgram, predecode
+
+# Каталог кеша по умолчанию (в текущем каталоге) и переменная окружения для его смены
+CACHE_DIR_NAME = '__uvmcache__'
+CACHE_DIR_ENV = 'UVM_CACHE_DIR'
+
+# Ограничение суммарного размера кеша по умолчанию
+DEFAULT_MAX_BYTES = 256 << 20
+
+# Формат файла .predecoded: сигнатура, количество команд, затем столбцы
+# opcodes (uint8) и dst, src1, src2 (int32 little-endian).
+# Версия 02: адрес записи write вычисляется по модулю 2^16
+_PREDECODED_MAGIC = b'UVMPDC02'
+
+def default_cache_dir():
+    """Каталог кеша: переменная окружения UVM_CACHE_DIR или ./__uvmcache__"""
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(os.getcwd(), CACHE_DIR_NAME)
+
+def _update_source_digest(digest, lines, optimize):
+    """
+    Хеширование строк исходника (bytes) в нормализованном виде: концы
+    строк \r\n и \r приводятся к \n, пробелы в конце строк и пустые
+    строки в конце текста отбрасываются. Поэтому текст из редактора GUI
+    (с завершающим \n от Tk) и тот же файл с концами строк CRLF дают
+    один ключ.
+    """
+    digest.update(f"uvm-asm {ASSEMBLER_VERSION} O{int(optimize)}\n".encode('ascii'))
+    blank = 0
+    for line in lines:
+        line = line.rstrip()
+        if not line:
+            # Пустые строки учитываются только перед непустой строкой
+            blank += 1
+            continue
+        if blank:
+            digest.update(b'\n' * blank)
+            blank = 0
+        digest.update(line)
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+def source_key(source, optimize=False):
+    """Ключ кеша для исходника (str или bytes)"""
+    if isinstance(source, str):
+        source = source.encode('utf-8')
+    return _update_source_digest(hashlib.sha256(), source.splitlines(), optimize)
+
+def file_source_key(path, optimize=False):
+    """Ключ кеша для файла исходника (файл читается построчно, ключ совпадает с source_key)"""
+    with open(path, 'rb') as file:
+        # Построчное чтение делит только по \n: \r из CRLF убирается rstrip,
+        # а одиночные \r (старый формат Mac) дочитываются splitlines
+        lines = (part for line in file for part in (line.splitlines() or [b'']))
+        return _update_source_digest(hashlib.sha256(), lines, optimize)
+
+def bytecode_key(bytecode):
+    """Ключ кеша для предекодированной программы"""
+    return hashlib.sha256(bytecode).hexdigest()
+
+def _columns_to_bytes(column):
+    if sys.byteorder == 'big':
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+def _columns_from_bytes(typecode, data):
+    column = array(typecode)
+    column.frombytes(data)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column
+
+def serialize_program(program):
+    """Сериализация DecodedProgram в байты"""
+    count = len(program)
+    parts = [_PREDECODED_MAGIC, count.to_bytes(8, 'little'), program.opcodes.tobytes()]
+    for column in (program.dst, program.src1, program.src2):
+        parts.append(_columns_to_bytes(column))
+    return b''.join(parts)
+
+def deserialize_program(data):
+    """Восстановление DecodedProgram из байтов serialize_program"""
+    if data[:8] != _PREDECODED_MAGIC:
+        raise ValueError("Неизвестный формат предекодированной программы")
+
+    count = int.from_bytes(data[8:16], 'little')
+    offset = 16
+    opcodes = array('B', data[offset:offset + count])
+    offset += count
+
+    columns = []
+    for _ in range(3):
+        size = count * 4
+        columns.append(_columns_from_bytes('i', data[offset:offset + size]))
+        offset += size
+
+    if offset != len(data) or any(len(column) != count for column in columns):
+        raise ValueError("Повреждённый файл предекодированной программы")
+
+    return DecodedProgram(opcodes, *columns)
+
+class AssemblyCache:
+    """Дисковый кеш байткода и предекодированных программ"""
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key, suffix):
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def _load(self, key, suffix):
+        """Чтение записи кеша; обращение обновляет её время для LRU"""
+        path = self._path(key, suffix)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return data
+
+    def _store(self, key, suffix, data=None, source_path=None):
+        """Атомарная запись в кеш (данных или копии файла) и вытеснение старых записей"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                if source_path is None:
+                    file.write(data)
+                else:
+                    with open(source_path, 'rb') as source:
+                        shutil.copyfileobj(source, file)
+            os.replace(temp_path, self._path(key, suffix))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Удаление давно не использованных записей сверх ограничения размера"""
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+
+        entries = []
+        total = 0
+        for name in names:
+            if not name.endswith(('.bin', '.predecoded')):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+
+    def get_bytecode(self, key):
+        """Байткод по ключу исходника или None"""
+        return self._load(key, '.bin')
+
+    def put_bytecode(self, key, bytecode):
+        self._store(key, '.bin', bytecode)
+
+    def copy_bytecode_to(self, key, output_path):
+        """Копирование закешированного байткода в файл; False, если записи нет"""
+        path = self._path(key, '.bin')
+        try:
+            shutil.copyfile(path, output_path)
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return False
+
+        self.hits += 1
+        return True
+
+    def put_bytecode_file(self, key, path):
+        """Сохранение в кеш байткода из файла"""
+        self._store(key, '.bin', source_path=path)
+
+    def assemble(self, text, optimize=False):
+        """Ассемблирование текста исходника с использованием кеша"""
+        key = source_key(text, optimize)
+        bytecode = self.get_bytecode(key)
+        if bytecode is not None:
+            return bytecode
+
+        IR = parse_assembly_language(text)
+        if optimize:
+            IR, _ = optimize_ir(IR)
+        bytecode = assemble_ir(IR)
+
+        self.put_bytecode(key, bytecode)
+        return bytecode
+
+    def predecoded(self, bytecode):
+        """Предекодированная программа для байткода с использованием кеша"""
+        key = bytecode_key(bytecode)
+        data = self._load(key, '.predecoded')
+        if data is not None:
+            try:
+                return deserialize_program(data)
+            except ValueError:
+                pass
+
+        program = predecode(bytecode)
+        self._store(key, '.predecoded', serialize_program(program))
+        return program
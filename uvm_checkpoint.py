@@ -0,0 +1,255 @@
+"""
+Контрольные точки долгого выполнения программ УВМ.
+
+Каталог контрольных точек содержит цепочку файлов с возрастающими
+номерами: полный снимок (*.full) и следующие за ним разностные (*.delta),
+в которых записаны только страницы памяти, изменившиеся с предыдущей точки.
+Каждый файл пишется атомарно (временный файл, fsync, os.replace), поэтому
+прерывание в любой момент оставляет последнюю целую точку. Возобновление
+берёт последний полный снимок и применяет к нему все последующие разности.
+
+Изменившиеся страницы находятся сравнением с теневой копией памяти на
+момент предыдущей точки: стоимость точки - один проход по памяти
+(не более 64K ячеек) и не зависит от числа выполненных команд.
+"""
+
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from uvm_interp import run_decoded
+from uvm_memory import PAGE_BITS, PAGE_SIZE, PagedMemory
+
+# Количество команд между контрольными точками по умолчанию
+CHECKPOINT_EVERY = 5_000_000
+
+# Количество разностных точек, после которого пишется новый полный снимок
+FULL_EVERY = 16
+
+# Заголовок файла: сигнатура, вид (0 - полный, 1 - разностный), номер следующей
+# команды, отпечаток программы, размер памяти, количество страниц.
+# Затем для каждой страницы: номер (uint32) и PAGE_SIZE ячеек int64 little-endian.
+CHECKPOINT_MAGIC = b'UVMCKP01'
+_HEADER = struct.Struct('<8sBQ32sII')
+_PAGE_INDEX = struct.Struct('<I')
+_KIND_FULL = 0
+_KIND_DELTA = 1
+_SUFFIXES = {_KIND_FULL: '.full', _KIND_DELTA: '.delta'}
+
+_ZERO_PAGE = [0] * PAGE_SIZE
+
+def program_fingerprint(bytecode):
+    """
+    Отпечаток программы: хеш всего байткода. Байткод обычно отображён
+    через mmap, поэтому это один последовательный проход по файлу.
+    """
+    return hashlib.sha256(bytecode).digest()
+
+def snapshot_pages(memory):
+    """
+    Копия памяти по страницам: словарь номер страницы -> список из PAGE_SIZE ячеек.
+    Для PagedMemory обходятся только выделенные страницы.
+    """
+    if isinstance(memory, PagedMemory):
+        return {base >> PAGE_BITS: list(page) for base, page in memory.iter_pages()}
+
+    values = memory[:]
+    values = values.tolist() if hasattr(values, 'tolist') else list(values)
+    pages = {}
+    for start in range(0, len(values), PAGE_SIZE):
+        page = values[start:start + PAGE_SIZE]
+        if len(page) < PAGE_SIZE:
+            page.extend([0] * (PAGE_SIZE - len(page)))
+        pages[start >> PAGE_BITS] = page
+    return pages
+
+def restore_pages(memory, pages):
+    """Запись страниц снимка в память данных"""
+    size = len(memory)
+    for index, page in sorted(pages.items()):
+        start = index << PAGE_BITS
+        values = page[:max(0, min(PAGE_SIZE, size - start))]
+        if isinstance(memory, array):
+            values = array(memory.typecode, values)
+        memory[start:start + len(values)] = values
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+def _encode(kind, ip, fingerprint, memory_size, pages):
+    parts = [_HEADER.pack(CHECKPOINT_MAGIC, kind, ip, fingerprint, memory_size, len(pages))]
+    for index, page in sorted(pages.items()):
+        values = array('q', page)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        parts.append(_PAGE_INDEX.pack(index))
+        parts.append(values.tobytes())
+    return b''.join(parts)
+
+def _decode(data):
+    magic, kind, ip, fingerprint, memory_size, count = _HEADER.unpack_from(data, 0)
+    if magic != CHECKPOINT_MAGIC:
+        raise ValueError("Неизвестный формат контрольной точки")
+
+    pages = {}
+    offset = _HEADER.size
+    page_bytes = PAGE_SIZE * 8
+    for _ in range(count):
+        index, = _PAGE_INDEX.unpack_from(data, offset)
+        offset += _PAGE_INDEX.size
+        values = array('q')
+        values.frombytes(data[offset:offset + page_bytes])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        pages[index] = values.tolist()
+        offset += page_bytes
+
+    if offset != len(data):
+        raise ValueError("Повреждённый файл контрольной точки")
+    return kind, ip, fingerprint, memory_size, pages
+
+def list_checkpoints(directory):
+    """Файлы контрольных точек каталога: список (номер, вид, путь) по возрастанию номера"""
+    entries = []
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return entries
+
+    for name in names:
+        stem, suffix = os.path.splitext(name)
+        for kind, kind_suffix in _SUFFIXES.items():
+            if suffix == kind_suffix and stem.isdigit():
+                entries.append((int(stem), kind, os.path.join(directory, name)))
+    return sorted(entries)
+
+def load_checkpoint(directory, fingerprint=None):
+    """
+    Состояние из последней цепочки контрольных точек.
+    Возвращает (номер следующей команды, страницы) или None, если точек нет.
+    """
+    entries = list_checkpoints(directory)
+    fulls = [i for i, (_, kind, _) in enumerate(entries) if kind == _KIND_FULL]
+    if not fulls:
+        return None
+
+    ip = 0
+    pages = {}
+    for _, _, path in entries[fulls[-1]:]:
+        with open(path, 'rb') as file:
+            kind, ip, stored, _, changed = _decode(file.read())
+        if fingerprint is not None and stored != fingerprint:
+            raise ValueError(f"Контрольная точка {path} относится к другой программе")
+        pages.update(changed)
+
+    return ip, pages
+
+class Checkpointer:
+    """
+    Запись контрольных точек выполнения в каталог.
+
+    every      - количество команд между точками
+    full_every - количество разностных точек между полными снимками
+    resume     - продолжить с последней точки каталога (см. restore)
+    """
+
+    def __init__(self, directory, fingerprint, every=CHECKPOINT_EVERY, full_every=FULL_EVERY,
+                 resume=False):
+        if every <= 0:
+            raise ValueError(f"Интервал контрольных точек должен быть положительным: {every}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fingerprint = fingerprint
+        self.every = every
+        self.full_every = full_every
+        self.resume = resume
+        self.saved = 0
+
+        entries = list_checkpoints(directory)
+        self._sequence = entries[-1][0] + 1 if entries else 0
+        self._shadow = None
+        self._deltas = 0
+        self._last_ip = 0
+
+    def restore(self, memory):
+        """
+        Загрузка последней точки в память (при resume).
+        Возвращает номер команды, с которой нужно продолжить выполнение.
+        """
+        if not self.resume:
+            return 0
+
+        state = load_checkpoint(self.directory, self.fingerprint)
+        if state is None:
+            return 0
+
+        ip, pages = state
+        restore_pages(memory, pages)
+        self._shadow = snapshot_pages(memory)
+        self._last_ip = ip
+        return ip
+
+    def maybe_save(self, ip, memory):
+        """Сохранение точки, если с предыдущей выполнено не менее every команд"""
+        if ip - self._last_ip >= self.every:
+            self.save(ip, memory)
+
+    def save(self, ip, memory):
+        """Сохранение контрольной точки: полной или разностной"""
+        pages = snapshot_pages(memory)
+
+        if self._shadow is None or self._deltas >= self.full_every:
+            kind = _KIND_FULL
+            changed = {index: page for index, page in pages.items() if page != _ZERO_PAGE}
+            self._deltas = 0
+        else:
+            kind = _KIND_DELTA
+            changed = {index: page for index, page in pages.items()
+                       if page != self._shadow.get(index, _ZERO_PAGE)}
+            self._deltas += 1
+
+        path = os.path.join(self.directory, f"{self._sequence:08d}{_SUFFIXES[kind]}")
+        _write_atomic(path, _encode(kind, ip, self.fingerprint, len(memory), changed))
+
+        if kind == _KIND_FULL:
+            # Предыдущие цепочки больше не нужны
+            for sequence, _, old_path in list_checkpoints(self.directory):
+                if sequence < self._sequence:
+                    os.unlink(old_path)
+
+        self._sequence += 1
+        self._shadow = pages
+        self._last_ip = ip
+        self.saved += 1
+        return path
+
+def run_checkpointed(program, data_memory, checkpointer):
+    """
+    Выполнение предекодированной программы отрезками по checkpointer.every
+    команд с контрольной точкой после каждого отрезка (и в конце выполнения).
+    При checkpointer.resume выполнение продолжается с последней точки.
+    Возвращает номер команды, с которой началось выполнение.
+    """
+    start = checkpointer.restore(data_memory)
+    count = len(program)
+
+    for begin in range(start, count, checkpointer.every):
+        end = min(begin + checkpointer.every, count)
+        run_decoded(program.slice(begin, end), data_memory)
+        checkpointer.save(end, data_memory)
+
+    return start
@@ -0,0 +1,95 @@
+"""
+Компиляция программ УВМ в функции Python.
+
+Программа УВМ не содержит переходов, поэтому вся она - один линейный
+базовый блок. Каждая команда превращается в одно присваивание, исходный
+текст компилируется через compile(), а готовая функция кешируется по хешу
+байткода.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+from uvm_interp import OP_LOAD_CONST, OP_READ, OP_WRITE, OP_MAX, predecode
+
+# Количество команд в одной сгенерированной функции: ограничивает
+# память и время компиляции для очень больших программ
+CHUNK_SIZE = 2000
+
+# Максимальное количество скомпилированных программ в кеше
+CACHE_SIZE = 64
+
+_compiled_cache = OrderedDict()
+
+def _unknown(op):
+    print(f"⚠ Неизвестная операция: {op}")
+
+def generate_statement(op, dst, src1, src2):
+    """Генерация одного присваивания Python для команды"""
+    if op == OP_LOAD_CONST:
+        return f"m[{dst}] = {src1}"
+    elif op == OP_READ or op == OP_WRITE:
+        return f"m[{dst}] = m[{src1}]"
+    elif op == OP_MAX:
+        return f"m[{dst}] = b if (b := m[{src1}]) >= (d := m[{src2}]) else d"
+    else:
+        return f"_unknown({src1})"
+
+def generate_source(program, start=0, stop=None):
+    """Генерация исходного текста функции для команд [start, stop)"""
+    if stop is None:
+        stop = len(program)
+
+    lines = ["def chunk(m):"]
+    for index in range(start, stop):
+        lines.append("    " + generate_statement(program.opcodes[index], program.dst[index],
+                                                 program.src1[index], program.src2[index]))
+    lines.append("    return m")
+
+    return "\n".join(lines) + "\n"
+
+def compile_decoded(program, name="<uvm>"):
+    """Компиляция предекодированной программы в функцию run(memory)"""
+    chunks = []
+
+    for start in range(0, len(program), CHUNK_SIZE):
+        source = generate_source(program, start, min(start + CHUNK_SIZE, len(program)))
+        namespace = {'_unknown': _unknown}
+        exec(compile(source, f"{name}:{start}", 'exec'), namespace)
+        chunks.append(namespace['chunk'])
+
+    def run(memory):
+        for chunk in chunks:
+            chunk(memory)
+        return memory
+
+    run.command_count = len(program)
+    run.max_operations = program.opcodes.count(OP_MAX)
+    return run
+
+def bytecode_digest(bytecode):
+    """Хеш байткода, используемый как ключ кеша"""
+    return hashlib.sha256(bytecode).hexdigest()
+
+def compile_program(bytecode):
+    """
+    Получение скомпилированной функции для байткода (с кешированием)
+    """
+    key = bytecode_digest(bytecode)
+
+    run = _compiled_cache.get(key)
+    if run is not None:
+        _compiled_cache.move_to_end(key)
+        return run
+
+    run = compile_decoded(predecode(bytecode), name=f"<uvm {key[:12]}>")
+    _compiled_cache[key] = run
+
+    if len(_compiled_cache) > CACHE_SIZE:
+        _compiled_cache.popitem(last=False)
+
+    return run
+
+def clear_cache():
+    """Очистка кеша скомпилированных программ"""
+    _compiled_cache.clear()
@@ -0,0 +1,223 @@
+"""
+Отладка программ УВМ с перемещением во времени.
+
+Каждая выполненная команда записывает в журнал отмены адрес записи и
+старое значение ячейки, поэтому выполнение можно отматывать назад по
+одной команде. Каждые snapshot_every команд сохраняется полный снимок
+памяти: дальняя перемотка восстанавливает ближайший снимок и быстро
+выполняет команды до нужной. При превышении ограничения памяти самая
+старая история (снимок и записи журнала до следующего снимка) вытесняется.
+"""
+
+from array import array
+
+from uvm_checkpoint import restore_pages, snapshot_pages
+from uvm_interp import OP_MAX, OP_NAMES, _HANDLERS, run_decoded
+from uvm_memory import ADDRESS_SPACE, PAGE_BITS, PAGE_SIZE, PagedMemory, allocate_memory
+
+# Количество команд между полными снимками памяти
+SNAPSHOT_EVERY = 65536
+
+# Ограничение памяти истории (журнал отмены и снимки), байт
+DEFAULT_HISTORY_BYTES = 64 << 20
+
+# Оценка стоимости записи журнала (адрес int32 + старое значение int64)
+# и ячейки снимка (указатель в списке страницы)
+_LOG_ENTRY_BYTES = 12
+_SNAPSHOT_CELL_BYTES = 8
+
+# Повторное выполнение от снимка примерно во столько раз дешевле отмены
+# одной команды журналом
+_REPLAY_SPEEDUP = 3
+
+# Адрес в журнале для команды, которая ничего не записывает
+_NO_ADDRESS = -1
+
+def describe_instruction(program, index):
+    """Текстовое описание команды предекодированной программы"""
+    op = program.opcodes[index]
+    dst, src1, src2 = program.dst[index], program.src1[index], program.src2[index]
+    name = OP_NAMES.get(op)
+
+    if name is None:
+        return f"[{index}] неизвестная операция {src1}"
+    if name == 'load_const':
+        return f"[{index}] load_const: memory[{dst}] = {src1}"
+    if op == OP_MAX:
+        return f"[{index}] max: memory[{dst}] = max(memory[{src1}], memory[{src2}])"
+    return f"[{index}] {name}: memory[{dst}] = memory[{src1}]"
+
+class TimeTravelDebugger:
+    """
+    Пошаговое выполнение предекодированной программы вперёд и назад.
+
+    ip - номер следующей команды; memory - текущая память данных.
+    history_start - самая ранняя команда, к которой ещё можно вернуться.
+    """
+
+    def __init__(self, program, memory=None, snapshot_every=SNAPSHOT_EVERY,
+                 max_history_bytes=DEFAULT_HISTORY_BYTES):
+        self.program = program
+        self.memory = memory if memory is not None else allocate_memory(ADDRESS_SPACE, 'paged')
+        self.snapshot_every = snapshot_every
+        self.max_history_bytes = max_history_bytes
+        self.ip = 0
+        self.history_start = 0
+
+        # Журнал отмены: запись k относится к команде history_start + k
+        self._log_addresses = array('i')
+        self._log_values = array('q')
+
+        # Снимки: номер команды -> страницы памяти перед её выполнением
+        self._snapshots = {0: snapshot_pages(self.memory)}
+        self._snapshot_bytes = {0: self._pages_bytes(self._snapshots[0])}
+
+    def __len__(self):
+        return len(self.program)
+
+    @property
+    def finished(self):
+        return self.ip >= len(self.program)
+
+    @property
+    def history_bytes(self):
+        """Оценка памяти, занятой историей"""
+        return len(self._log_addresses) * _LOG_ENTRY_BYTES + sum(self._snapshot_bytes.values())
+
+    @staticmethod
+    def _pages_bytes(pages):
+        return len(pages) * PAGE_SIZE * _SNAPSHOT_CELL_BYTES
+
+    def describe(self, index):
+        """Описание команды index"""
+        return describe_instruction(self.program, index)
+
+    def current_instruction(self):
+        """Описание следующей команды (None в конце программы)"""
+        if self.finished:
+            return None
+        return self.describe(self.ip)
+
+    def step(self, count=1):
+        """Выполнение count команд вперёд. Возвращает количество выполненных."""
+        start = self.ip
+        self.run_to(min(len(self.program), self.ip + count))
+        return self.ip - start
+
+    def run_to(self, target=None):
+        """Выполнение вперёд до команды target (по умолчанию - до конца программы)"""
+        if target is None:
+            target = len(self.program)
+        target = min(target, len(self.program))
+
+        program = self.program
+        opcodes, dst, src1, src2 = program.opcodes, program.dst, program.src1, program.src2
+        memory = self.memory
+        log_address = self._log_addresses.append
+        log_value = self._log_values.append
+
+        while self.ip < target:
+            # Отрезок до следующего снимка
+            stop = min(target, (self.ip // self.snapshot_every + 1) * self.snapshot_every)
+            for index in range(self.ip, stop):
+                op = opcodes[index]
+                address = dst[index]
+                if op in OP_NAMES:
+                    log_address(address)
+                    log_value(memory[address])
+                else:
+                    log_address(_NO_ADDRESS)
+                    log_value(0)
+                _HANDLERS[op](memory, address, src1[index], src2[index])
+            self.ip = stop
+
+            if stop % self.snapshot_every == 0 and stop not in self._snapshots:
+                self._snapshots[stop] = snapshot_pages(memory)
+                self._snapshot_bytes[stop] = self._pages_bytes(self._snapshots[stop])
+                self._evict()
+
+        return self.ip
+
+    def step_back(self, count=1):
+        """Возврат на count команд назад. Возвращает количество отменённых."""
+        start = self.ip
+        self.rewind_to(max(self.history_start, self.ip - count))
+        return start - self.ip
+
+    def rewind_to(self, target):
+        """
+        Переход к состоянию перед выполнением команды target.
+        Вперёд - обычным выполнением, назад - журналом отмены или
+        восстановлением ближайшего снимка (что дешевле).
+        """
+        if target >= self.ip:
+            return self.run_to(target)
+        if target < self.history_start:
+            raise ValueError(f"История до команды {self.history_start} вытеснена "
+                             f"(ограничение {self.max_history_bytes} байт)")
+
+        snapshot = max(ip for ip in self._snapshots if ip <= target)
+        if (target - snapshot) < (self.ip - target) * _REPLAY_SPEEDUP:
+            self._replay(snapshot, target)
+        else:
+            self._undo(target)
+
+        # Журнал и снимки после target больше не соответствуют состоянию
+        del self._log_addresses[target - self.history_start:]
+        del self._log_values[target - self.history_start:]
+        for ip in [ip for ip in self._snapshots if ip > target]:
+            del self._snapshots[ip]
+            del self._snapshot_bytes[ip]
+
+        self.ip = target
+        return self.ip
+
+    def _undo(self, target):
+        memory = self.memory
+        base = self.history_start
+        addresses, values = self._log_addresses, self._log_values
+        for index in range(self.ip - 1, target - 1, -1):
+            address = addresses[index - base]
+            if address != _NO_ADDRESS:
+                memory[address] = values[index - base]
+
+    def _replay(self, snapshot, target):
+        pages = self._snapshots[snapshot]
+        memory = self.memory
+        if isinstance(memory, PagedMemory):
+            # Страницы, выделенные после снимка, обнуляются
+            size = len(memory)
+            for base, _ in list(memory.iter_pages()):
+                if base >> PAGE_BITS not in pages:
+                    count = min(PAGE_SIZE, size - base)
+                    memory[base:base + count] = [0] * count
+        restore_pages(memory, pages)
+        if target > snapshot:
+            run_decoded(self.program.slice(snapshot, target), memory)
+
+    def _evict(self):
+        """Вытеснение самой старой истории при превышении ограничения"""
+        while self.history_bytes > self.max_history_bytes and len(self._snapshots) > 1:
+            oldest = min(self._snapshots)
+            del self._snapshots[oldest]
+            del self._snapshot_bytes[oldest]
+
+            new_start = min(self._snapshots)
+            del self._log_addresses[:new_start - self.history_start]
+            del self._log_values[:new_start - self.history_start]
+            self.history_start = new_start
+
+    def written_addresses(self, start, stop):
+        """Адреса, в которые пишут команды [start, stop)"""
+        program = self.program
+        return {address for op, address in zip(program.opcodes[start:stop], program.dst[start:stop])
+                if op in OP_NAMES}
+
+    def last_writer(self, address):
+        """Номер последней выполненной команды, записавшей address (или None)"""
+        dst = self.program.dst
+        opcodes = self.program.opcodes
+        for index in range(self.ip - 1, -1, -1):
+            if dst[index] == address and opcodes[index] in OP_NAMES:
+                return index
+        return None
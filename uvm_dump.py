@@ -0,0 +1,317 @@
+"""
+Форматы дампа памяти данных УВМ.
+
+  xml   - исходный формат (uvm_interp.save_xml_dump)
+  bin   - двоичный образ: заголовок, таблица диапазонов, таблица сегментов
+          и данные сегментов (little-endian, выравнивание 8 байт); сегменты
+          читаются через mmap без разбора
+  npy   - массив NumPy (N, 2) пар (адрес, значение); пишется без NumPy,
+          читается через numpy.load(..., mmap_mode='r')
+  csv   - строки range,address,count,value,hex
+  jsonl - строка метаданных, затем по строке на ячейку или серию нулей
+
+При сжатии (rle) серии нулей длиной от MIN_ZERO_RUN ячеек не записываются
+поячеечно: в bin и npy они просто отсутствуют (ячейки вне сегментов
+нулевые), в csv и jsonl записываются одной строкой с count, в xml - элементом
+<zeros address="..." count="..."/>.
+"""
+
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from uvm_interp import XML_BUFFER_SIZE, XML_CHUNK, parse_address_ranges, write_xml_dump_file
+from uvm_memory import PAGE_BITS, PAGE_SIZE, PagedMemory
+
+DUMP_FORMATS = ('xml', 'bin', 'npy', 'csv', 'jsonl')
+
+# Минимальная длина серии нулей, сжимаемой при rle
+MIN_ZERO_RUN = 4
+
+# Двоичный формат: сигнатура, байт на ячейку, флаги, резерв,
+# количество диапазонов, количество сегментов
+BIN_MAGIC = b'UVMDUMP1'
+BIN_HEADER = struct.Struct('<8sBBHII')
+BIN_RANGE = struct.Struct('<ii')        # первый и последний адрес диапазона
+BIN_SEGMENT = struct.Struct('<IIQ')     # адрес, количество ячеек, смещение данных
+BIN_FLAG_RLE = 1
+
+_TYPECODES = {32: 'i', 64: 'q'}
+_NPY_DESCR = {32: '<i4', 64: '<i8'}
+
+def dump_format_for(path):
+    """Формат дампа по расширению файла (по умолчанию xml)"""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    return extension if extension in DUMP_FORMATS else 'xml'
+
+def clip_ranges(memory, ranges):
+    """Корректировка границ диапазонов по размеру памяти (как в XML-дампе)"""
+    return [(max(0, start), min(len(memory) - 1, end)) for start, end in ranges]
+
+def _little_endian(data):
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+def _values(memory, start, stop):
+    values = memory[start:stop]
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
+
+def _chunks(memory, start, end):
+    """
+    Блоки адресов start..end: тройки (начало, конец, нулевой ли блок).
+    Для PagedMemory блоки совпадают со страницами, и невыделенные
+    страницы не читаются.
+    """
+    if not isinstance(memory, PagedMemory):
+        for chunk_start in range(start, end + 1, XML_CHUNK):
+            yield chunk_start, min(chunk_start + XML_CHUNK, end + 1), False
+        return
+
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min((chunk_start >> PAGE_BITS) * PAGE_SIZE + PAGE_SIZE, end + 1)
+        yield chunk_start, chunk_end, memory.is_zero_page(chunk_start >> PAGE_BITS)
+        chunk_start = chunk_end
+
+def iter_runs(memory, start, end, rle=False, min_zero_run=MIN_ZERO_RUN):
+    """
+    Разбиение диапазона start..end на серии.
+    Возвращает кортежи (адрес, значения, 0) для записываемых ячеек
+    и (адрес, None, длина) для сжатых серий нулей.
+    """
+    if end < start:
+        return
+
+    if not rle:
+        for chunk_start in range(start, end + 1, XML_CHUNK):
+            chunk_end = min(chunk_start + XML_CHUNK, end + 1)
+            yield chunk_start, _values(memory, chunk_start, chunk_end), 0
+        return
+
+    data_start = start
+    data = []
+    zeros = 0
+
+    for chunk_start, chunk_end, is_zero in _chunks(memory, start, end):
+        if is_zero:
+            zeros += chunk_end - chunk_start
+            continue
+
+        for value in _values(memory, chunk_start, chunk_end):
+            if value == 0:
+                zeros += 1
+                continue
+
+            if zeros >= min_zero_run:
+                if data:
+                    yield data_start, data, 0
+                yield data_start + len(data), None, zeros
+                data_start += len(data) + zeros
+                data = []
+            elif zeros:
+                data.extend([0] * zeros)
+            zeros = 0
+            data.append(value)
+
+    if zeros >= min_zero_run:
+        if data:
+            yield data_start, data, 0
+        yield data_start + len(data), None, zeros
+    else:
+        data.extend([0] * zeros)
+        if data:
+            yield data_start, data, 0
+
+def _merged_segments(memory, start, end, rle):
+    """Непрерывные сегменты ненулевых данных (соседние блоки объединяются)"""
+    segments = []
+    for address, values, _ in iter_runs(memory, start, end, rle):
+        if values is None:
+            continue
+        if segments and segments[-1][0] + len(segments[-1][1]) == address:
+            segments[-1][1].extend(values)
+        else:
+            segments.append((address, list(values)))
+    return segments
+
+def write_bin_dump(path, memory, ranges, rle=False, word_bits=32):
+    """Двоичный образ памяти с заголовком и таблицей сегментов"""
+    ranges = clip_ranges(memory, ranges)
+    typecode = _TYPECODES[word_bits]
+    word_bytes = word_bits // 8
+
+    segments = []
+    for start, end in ranges:
+        segments.extend(_merged_segments(memory, start, end, rle))
+
+    offset = BIN_HEADER.size + BIN_RANGE.size * len(ranges) + BIN_SEGMENT.size * len(segments)
+    table = []
+    for address, values in segments:
+        offset += -offset % 8
+        table.append((address, len(values), offset))
+        offset += len(values) * word_bytes
+
+    with open(path, 'wb') as f:
+        f.write(BIN_HEADER.pack(BIN_MAGIC, word_bytes, BIN_FLAG_RLE if rle else 0, 0,
+                                len(ranges), len(segments)))
+        for start, end in ranges:
+            f.write(BIN_RANGE.pack(start, end))
+        for entry in table:
+            f.write(BIN_SEGMENT.pack(*entry))
+
+        for (address, values), (_, _, data_offset) in zip(segments, table):
+            f.write(bytes(data_offset - f.tell()))
+            f.write(_little_endian(array(typecode, values)))
+
+def read_bin_dump(path):
+    """
+    Чтение двоичного дампа через mmap (на little-endian платформе).
+    Возвращает (диапазоны, сегменты, флаги): сегменты - список пар
+    (адрес, memoryview значений без копирования). mmap закрывается
+    сборщиком мусора после освобождения всех представлений.
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, word_bytes, flags, _, range_count, segment_count = BIN_HEADER.unpack_from(mapped, 0)
+    if magic != BIN_MAGIC:
+        mapped.close()
+        raise ValueError(f"{path}: неизвестный формат двоичного дампа")
+
+    offset = BIN_HEADER.size
+    ranges = []
+    for _ in range(range_count):
+        ranges.append(BIN_RANGE.unpack_from(mapped, offset))
+        offset += BIN_RANGE.size
+
+    view = memoryview(mapped)
+    typecode = 'i' if word_bytes == 4 else 'q'
+    segments = []
+    for _ in range(segment_count):
+        address, count, data_offset = BIN_SEGMENT.unpack_from(mapped, offset)
+        offset += BIN_SEGMENT.size
+        segments.append((address, view[data_offset:data_offset + count * word_bytes].cast(typecode)))
+
+    return ranges, segments, flags
+
+def load_bin_dump(path, size=None):
+    """Восстановление памяти (список) из двоичного дампа; ячейки вне сегментов - нули"""
+    ranges, segments, _ = read_bin_dump(path)
+    if size is None:
+        size = max([end + 1 for _, end in ranges] + [0])
+
+    memory = [0] * size
+    for address, values in segments:
+        memory[address:address + len(values)] = values.tolist()
+        values.release()
+    return memory
+
+def write_npy_dump(path, memory, ranges, rle=False, word_bits=32):
+    """
+    Массив .npy формы (N, 2): пары (адрес, значение).
+    Заголовок формата NPY 1.0 формируется вручную, NumPy не нужен.
+    """
+    ranges = clip_ranges(memory, ranges)
+    segments = []
+    for start, end in ranges:
+        segments.extend(_merged_segments(memory, start, end, rle))
+    rows = sum(len(values) for _, values in segments)
+
+    header = ("{'descr': '%s', 'fortran_order': False, 'shape': (%d, 2), }"
+              % (_NPY_DESCR[word_bits], rows))
+    # Длина преамбулы (10 байт) и заголовка с '\n' кратна 64
+    header += ' ' * (-(10 + len(header) + 1) % 64) + '\n'
+
+    typecode = _TYPECODES[word_bits]
+    with open(path, 'wb') as f:
+        f.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1'))
+        for address, values in segments:
+            pairs = array(typecode, bytes(2 * len(values) * (word_bits // 8)))
+            pairs[0::2] = array(typecode, range(address, address + len(values)))
+            pairs[1::2] = array(typecode, values)
+            f.write(_little_endian(pairs))
+
+def write_csv_dump(path, memory, ranges, rle=False):
+    """CSV: range,address,count,value,hex (count > 1 - серия нулей)"""
+    ranges = clip_ranges(memory, ranges)
+    with open(path, 'w', encoding='utf-8', newline='', buffering=XML_BUFFER_SIZE) as f:
+        writer = csv.writer(f)
+        writer.writerow(('range', 'address', 'count', 'value', 'hex'))
+        for i, (start, end) in enumerate(ranges):
+            for address, values, zeros in iter_runs(memory, start, end, rle):
+                if values is None:
+                    writer.writerow((i, address, zeros, 0, '0x0'))
+                else:
+                    writer.writerows((i, address + k, 1, value, f"0x{value:X}")
+                                     for k, value in enumerate(values))
+
+def write_jsonl_dump(path, memory, ranges, rle=False):
+    """JSON lines: строка метаданных, затем ячейки и серии нулей"""
+    ranges = clip_ranges(memory, ranges)
+    with open(path, 'w', encoding='utf-8', buffering=XML_BUFFER_SIZE) as f:
+        f.write(json.dumps({'total_cells': len(memory), 'ranges': ranges, 'rle': rle}) + "\n")
+        for i, (start, end) in enumerate(ranges):
+            for address, values, zeros in iter_runs(memory, start, end, rle):
+                if values is None:
+                    f.write(f'{{"range": {i}, "address": {address}, "value": 0, "count": {zeros}}}\n')
+                else:
+                    f.writelines(f'{{"range": {i}, "address": {address + k}, "value": {value}}}\n'
+                                 for k, value in enumerate(values))
+
+def write_xml_rle_dump(path, memory, ranges):
+    """XML-дамп, в котором серии нулей записаны элементами <zeros/>"""
+    with open(path, 'w', encoding='utf-8', buffering=XML_BUFFER_SIZE) as f:
+        f.write('<?xml version="1.0" ?>\n<memory_dump>\n  <metadata>\n')
+        f.write(f'    <total_cells>{len(memory)}</total_cells>\n')
+        f.write(f'    <ranges_count>{len(ranges)}</ranges_count>\n  </metadata>\n')
+
+        for i, (start, end) in enumerate(clip_ranges(memory, ranges)):
+            element = f'  <range id="{i}" start="{start}" end="{end}" size="{end - start + 1}"'
+            if end < start:
+                f.write(element + '/>\n')
+                continue
+
+            f.write(element + '>\n')
+            for address, values, zeros in iter_runs(memory, start, end, rle=True):
+                if values is None:
+                    f.write(f'    <zeros address="{address}" count="{zeros}"/>\n')
+                else:
+                    f.writelines(f'    <cell address="{address + k}" value="{value}" hex="0x{value:X}"/>\n'
+                                 for k, value in enumerate(values))
+            f.write('  </range>\n')
+
+        f.write('</memory_dump>\n')
+
+def save_dump(memory, output_file, addr_range, dump_format=None, rle=False, word_bits=32):
+    """
+    Сохранение дампа памяти в выбранном формате (по умолчанию - по расширению файла).
+    Ошибки (неверный диапазон, недоступный файл) передаются вызывающему.
+    """
+    dump_format = dump_format or dump_format_for(output_file)
+    if dump_format == 'xml' and not rle:
+        write_xml_dump_file(memory, output_file, addr_range)
+        return
+
+    ranges = parse_address_ranges(addr_range)
+
+    if dump_format == 'xml':
+        write_xml_rle_dump(output_file, memory, ranges)
+    elif dump_format == 'bin':
+        write_bin_dump(output_file, memory, ranges, rle, word_bits)
+    elif dump_format == 'npy':
+        write_npy_dump(output_file, memory, ranges, rle, word_bits)
+    elif dump_format == 'csv':
+        write_csv_dump(output_file, memory, ranges, rle)
+    elif dump_format == 'jsonl':
+        write_jsonl_dump(output_file, memory, ranges, rle)
+    else:
+        raise ValueError(f"Неизвестный формат дампа: {dump_format}")
+
+    compressed = ", серии нулей сжаты" if rle else ""
+    print(f"✅ Дамп памяти сохранен в {output_file} ({dump_format}{compressed})")
+    print(f"   Размер: {os.path.getsize(output_file)} байт")
@@ -5,7 +5,8 @@
 """
 
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, filedialog
+from tkinter import ttk, scrolledtext, messagebox, filedialog, simpledialog
+import tkinter.font as tkfont
 import subprocess
 import os
 import sys
@@ -15,13 +16,223 @@ from datetime import datetime
 
 # Импортируем функции из наших модулей
 try:
-    from uvm_asm import parse_assembly_language, assemble_ir, display_test_results
-    from uvm_interp import execute_program, save_xml_dump
+    from uvm_asm import display_test_results
+    from uvm_interp import execute_iter, print_execution_stats, OP_MAX
+    from uvm_dump import DUMP_FORMATS, save_dump
+    from uvm_cache import AssemblyCache
+    from uvm_debug import TimeTravelDebugger
+    from uvm_memory import ADDRESS_SPACE
     HAS_MODULES = True
 except ImportError:
     HAS_MODULES = False
     print("⚠  Модули uvm_asm и uvm_interp не найдены. Используется fallback-режим.")
 
+class MemoryView(ttk.Frame):
+    """
+    Виртуальная сетка памяти данных: в Text выводятся только видимые строки.
+    
+    Прокрутка, колесо мыши и изменение размера перерисовывают видимое окно,
+    поэтому стоимость отрисовки не зависит от размера памяти (64K ячеек).
+    Ячейки, изменившиеся с предыдущего set_memory, подсвечиваются.
+    """
+    
+    # Количество ячеек в строке сетки
+    COLUMNS = 8
+    
+    def __init__(self, parent, font=("Courier New", 9)):
+        super().__init__(parent)
+        self.memory = None
+        self.previous = None
+        self.changed = set()
+        self.first_row = 0
+        self.visible_rows = 1
+        self.target = None
+        
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+        
+        # Панель: переход к адресу, формат, сведения
+        panel = ttk.Frame(self)
+        panel.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 4))
+        ttk.Label(panel, text="Адрес:").pack(side=tk.LEFT)
+        self.address_entry = ttk.Entry(panel, width=10)
+        self.address_entry.pack(side=tk.LEFT, padx=2)
+        self.address_entry.bind('<Return>', lambda e: self.jump_to_entry())
+        ttk.Button(panel, text="Перейти", command=self.jump_to_entry).pack(side=tk.LEFT, padx=2)
+        
+        self.hex_mode = tk.BooleanVar(value=False)
+        ttk.Checkbutton(panel, text="hex", variable=self.hex_mode,
+                        command=self.render).pack(side=tk.LEFT, padx=6)
+        self.info_label = ttk.Label(panel, text="")
+        self.info_label.pack(side=tk.LEFT, padx=6)
+        
+        self.text = tk.Text(self, width=50, height=15, font=font, wrap=tk.NONE)
+        self.text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.text.tag_configure("changed", background="#FFF2A8")
+        self.text.tag_configure("target", background="#A8D8FF")
+        self.text.tag_configure("address", foreground="#808080")
+        self.text.config(state=tk.DISABLED)
+        
+        # Вертикальная прокрутка управляется вручную: позиция - номер первой строки
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        xscroll = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.text.xview)
+        xscroll.grid(row=2, column=0, sticky=(tk.W, tk.E))
+        self.text.config(xscrollcommand=xscroll.set)
+        
+        self.text.bind('<Configure>', lambda e: self.update_visible_rows())
+        self.text.bind('<MouseWheel>', lambda e: self.scroll_rows(-1 if e.delta > 0 else 1) or "break")
+        self.text.bind('<Button-4>', lambda e: self.scroll_rows(-1) or "break")
+        self.text.bind('<Button-5>', lambda e: self.scroll_rows(1) or "break")
+        self.text.bind('<Prior>', lambda e: self.scroll_rows(-self.visible_rows) or "break")
+        self.text.bind('<Next>', lambda e: self.scroll_rows(self.visible_rows) or "break")
+        
+    @property
+    def total_rows(self):
+        if self.memory is None:
+            return 0
+        return (len(self.memory) + self.COLUMNS - 1) // self.COLUMNS
+        
+    def set_memory(self, memory, focus=None, note=None, changed=None):
+        """
+        Показ памяти данных. Ячейки, отличающиеся от предыдущего показа
+        (или от нулей при первом), подсвечиваются; focus - адрес, к которому
+        нужно перейти, note - дополнительный текст в строке сведений.
+        changed - уже известные изменённые адреса (например, от отладчика):
+        тогда память не копируется и не сравнивается целиком.
+        """
+        previous = self.previous
+        if changed is not None and previous is not None and len(previous) == len(memory):
+            self.changed = set(changed)
+            for addr in self.changed:
+                previous[addr] = memory[addr]
+        else:
+            values = memory[:]
+            values = values.tolist() if hasattr(values, 'tolist') else list(values)
+            
+            if previous is None or len(previous) != len(values):
+                self.changed = {addr for addr, value in enumerate(values) if value}
+            else:
+                self.changed = {addr for addr, (old, new) in enumerate(zip(previous, values)) if old != new}
+            self.previous = values
+        self.memory = memory
+        info = f"{len(memory)} ячеек, изменено: {len(self.changed)}"
+        self.info_label.config(text=f"{info} | {note}" if note else info)
+        
+        if focus is not None:
+            self.jump_to(focus)
+        else:
+            self.render()
+            
+    def show_text(self, text):
+        """Вывод обычного текста вместо сетки (до следующего set_memory)"""
+        self.memory = None
+        self.target = None
+        self.info_label.config(text="")
+        self.text.config(state=tk.NORMAL)
+        self.text.delete(1.0, tk.END)
+        self.text.insert(1.0, text)
+        self.text.config(state=tk.DISABLED)
+        
+    def update_visible_rows(self):
+        """Пересчёт количества видимых строк по высоте виджета"""
+        line_height = tkfont.Font(font=self.text['font']).metrics('linespace') or 1
+        self.visible_rows = max(1, self.text.winfo_height() // line_height)
+        self.render()
+        
+    def yview(self, *args):
+        """Команда вертикальной полосы прокрутки"""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self.first_row = int(float(args[1]) * self.total_rows)
+        elif args[0] == 'scroll':
+            count = int(args[1])
+            if args[2] == 'pages':
+                count *= self.visible_rows
+            self.first_row += count
+        self.render()
+        
+    def scroll_rows(self, count):
+        self.first_row += count
+        self.render()
+        
+    def jump_to_entry(self):
+        """Переход к адресу из поля ввода (десятичный или 0x...)"""
+        text = self.address_entry.get().strip()
+        try:
+            address = int(text, 0)
+        except ValueError:
+            try:
+                address = int(text, 10)
+            except ValueError:
+                messagebox.showwarning("Переход к адресу", f"Некорректный адрес: {text}")
+                return
+        self.jump_to(address)
+        
+    def jump_to(self, address):
+        """Прокрутка к адресу: его строка выводится в верхней части окна"""
+        if self.memory is None:
+            return
+        self.target = max(0, min(address, len(self.memory) - 1))
+        self.first_row = self.target // self.COLUMNS - min(2, self.visible_rows // 4)
+        self.render()
+        
+    def cell_width(self):
+        return 8 if self.hex_mode.get() else 11
+        
+    def format_row(self, row):
+        """
+        Строка сетки: текст и список (столбец начала, столбец конца, тег)
+        для подсвечиваемых ячеек.
+        """
+        hex_mode = self.hex_mode.get()
+        width = self.cell_width()
+        start = row * self.COLUMNS
+        stop = min(start + self.COLUMNS, len(self.memory))
+        
+        prefix = f"{start:04X}: " if hex_mode else f"{start:05}: "
+        cells = []
+        spans = []
+        column = len(prefix)
+        for addr, value in zip(range(start, stop), self.memory[start:stop]):
+            if hex_mode:
+                cell = f"{int(value) & 0xFFFFFFFF:08X}"
+            else:
+                cell = f"{int(value):>{width}}"
+            if addr == self.target:
+                spans.append((column, column + width, "target"))
+            elif addr in self.changed:
+                spans.append((column, column + width, "changed"))
+            cells.append(cell)
+            column += width + 1
+        return prefix + " ".join(cells), spans
+        
+    def render(self):
+        """Отрисовка только видимых строк"""
+        if self.memory is None:
+            return
+            
+        total = self.total_rows
+        self.first_row = max(0, min(self.first_row, total - self.visible_rows))
+        last_row = min(total, self.first_row + self.visible_rows)
+        
+        self.text.config(state=tk.NORMAL)
+        self.text.delete(1.0, tk.END)
+        for line, row in enumerate(range(self.first_row, last_row), start=1):
+            content, spans = self.format_row(row)
+            if line > 1:
+                self.text.insert(tk.END, "\n")
+            self.text.insert(tk.END, content)
+            prefix_end = content.index(":") + 1
+            self.text.tag_add("address", f"{line}.0", f"{line}.{prefix_end}")
+            for begin, end, tag in spans:
+                self.text.tag_add(tag, f"{line}.{begin}", f"{line}.{end}")
+        self.text.config(state=tk.DISABLED)
+        
+        if total:
+            self.scrollbar.set(self.first_row / total, last_row / total)
+            
 class UVM_GUI:
     def __init__(self, root):
         self.root = root
@@ -32,7 +243,14 @@ class UVM_GUI:
         self.current_file = None
         self.program_text = ""
         self.memory_dump = ""
+        self.bytecode = None
+        self.data_memory = None
         self.assembly_result = ""
+        self.assembly_cache = AssemblyCache() if HAS_MODULES else None
+        self.debugger = None
+        self.debug_shown_ip = None
+        self.execution = None
+        self.execution_program = None
         
         # Создаем интерфейс
         self.setup_ui()
@@ -71,6 +289,10 @@ class UVM_GUI:
                   style="Accent.TButton").pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="🧪 Тесты", command=self.run_tests).pack(side=tk.LEFT, padx=2)
         ttk.Separator(toolbar, orient=tk.VERTICAL).pack(side=tk.LEFT, padx=5, fill=tk.Y)
+        ttk.Button(toolbar, text="🐞 Отладка", command=self.start_debugging).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="◀ Шаг назад", command=self.debug_step_back).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Шаг ▶", command=self.debug_step).pack(side=tk.LEFT, padx=2)
+        ttk.Separator(toolbar, orient=tk.VERTICAL).pack(side=tk.LEFT, padx=5, fill=tk.Y)
         ttk.Button(toolbar, text="❓ Справка", command=self.show_help).pack(side=tk.LEFT, padx=2)
         
         # Стиль для акцентных кнопок
@@ -114,10 +336,9 @@ class UVM_GUI:
         tab2.columnconfigure(0, weight=1)
         tab2.rowconfigure(0, weight=1)
         
-        self.memory_output = scrolledtext.ScrolledText(tab2, width=50, height=15,
-                                                      font=("Courier New", 9))
-        self.memory_output.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        self.memory_output.config(state=tk.DISABLED)
+        # Виртуальная сетка памяти
+        self.memory_view = MemoryView(tab2)
+        self.memory_view.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Вкладка 3: Консоль
         tab3 = ttk.Frame(self.notebook)
@@ -146,6 +367,7 @@ class UVM_GUI:
         file_menu.add_command(label="Открыть...", command=self.open_file, accelerator="Ctrl+O")
         file_menu.add_command(label="Сохранить", command=self.save_file, accelerator="Ctrl+S")
         file_menu.add_command(label="Сохранить как...", command=self.save_as_file)
+        file_menu.add_command(label="Экспорт дампа памяти...", command=self.export_memory_dump)
         file_menu.add_separator()
         file_menu.add_command(label="Выход", command=self.root.quit, accelerator="Alt+F4")
         
@@ -161,9 +383,19 @@ class UVM_GUI:
         menubar.add_cascade(label="Выполнение", menu=run_menu)
         run_menu.add_command(label="Ассемблировать", command=self.assemble_program, accelerator="F5")
         run_menu.add_command(label="Выполнить программу", command=self.execute_program, accelerator="F6")
+        run_menu.add_command(label="Прервать выполнение", command=self.cancel_execution, accelerator="Esc")
         run_menu.add_separator()
         run_menu.add_command(label="Запустить тесты", command=self.run_tests)
         
+        # Меню Отладка
+        debug_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Отладка", menu=debug_menu)
+        debug_menu.add_command(label="Начать отладку", command=self.start_debugging, accelerator="F9")
+        debug_menu.add_command(label="Шаг вперёд", command=self.debug_step, accelerator="F10")
+        debug_menu.add_command(label="Шаг назад", command=self.debug_step_back, accelerator="Shift+F10")
+        debug_menu.add_command(label="Перейти к команде...", command=self.debug_rewind)
+        debug_menu.add_command(label="Выполнить до конца", command=self.debug_run_to_end)
+        
         # Меню Примеры
         examples_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Примеры", menu=examples_menu)
@@ -185,6 +417,10 @@ class UVM_GUI:
         self.root.bind('<Control-s>', lambda e: self.save_file())
         self.root.bind('<F5>', lambda e: self.assemble_program())
         self.root.bind('<F6>', lambda e: self.execute_program())
+        self.root.bind('<Escape>', lambda e: self.cancel_execution())
+        self.root.bind('<F9>', lambda e: self.start_debugging())
+        self.root.bind('<F10>', lambda e: self.debug_step())
+        self.root.bind('<Shift-F10>', lambda e: self.debug_step_back())
         
     def update_status(self, message):
         """Обновление статусной строки"""
@@ -396,20 +632,25 @@ class UVM_GUI:
         
         try:
             if HAS_MODULES:
-                # Используем наши модули
-                IR = parse_assembly_language(program_text)
-                bytecode = assemble_ir(IR)
+                # Используем наши модули; неизменённый исходник берётся из кеша
+                hits = self.assembly_cache.hits
+                bytecode = self.assembly_cache.assemble(program_text)
+                command_count = len(bytecode) // 7
+                from_cache = self.assembly_cache.hits > hits
                 
-                # Сохраняем временный файл
-                with open('temp_program.bin', 'wb') as f:
-                    f.write(bytecode)
+                # Байткод хранится в памяти до выполнения
+                self.bytecode = bytecode
+                # Отладка старой программы завершается: F10 начнёт сеанс заново
+                self.debugger = None
+                self.debug_shown_ip = None
                     
                 # Выводим результаты ТОЧНО как в спецификации
                 self.asm_output.config(state=tk.NORMAL)
                 self.asm_output.delete(1.0, tk.END)
                 
-                output = f"✅ Ассемблирование успешно!\n"
-                output += f"Команд: {len(IR)}\n"
+                output = f"✅ Ассемблирование успешно!"
+                output += " (из кеша)\n" if from_cache else "\n"
+                output += f"Команд: {command_count}\n"
                 output += f"Размер: {len(bytecode)} байт\n\n"
                 output += "🎯 Байткод в формате спецификации:\n"
                 output += "=" * 70 + "\n"
@@ -424,8 +665,8 @@ class UVM_GUI:
                 self.asm_output.config(state=tk.DISABLED)
                 
                 self.notebook.select(0)  # Переключаемся на вкладку ассемблирования
-                self.update_status(f"Ассемблировано {len(IR)} команд")
-                self.log_to_console(f"Ассемблирование успешно: {len(IR)} команд, {len(bytecode)} байт")
+                self.update_status(f"Ассемблировано {command_count} команд")
+                self.log_to_console(f"Ассемблирование успешно: {command_count} команд, {len(bytecode)} байт")
                 
             else:
                 # Fallback: используем внешний скрипт
@@ -463,44 +704,20 @@ class UVM_GUI:
         
         try:
             if HAS_MODULES:
-                # Загружаем байткод
-                with open('temp_program.bin', 'rb') as f:
-                    bytecode = f.read()
-                    
-                # Выполняем программу
-                memory = execute_program(bytecode, data_memory_size=4096, verbose=False)
-                
-                # Создаем XML дамп
-                xml_content = self.create_xml_dump(memory, "0-100")
-                
-                # Выводим дамп памяти
-                self.memory_output.config(state=tk.NORMAL)
-                self.memory_output.delete(1.0, tk.END)
-                
-                # Парсим XML для красивого отображения
-                try:
-                    root = ET.fromstring(xml_content)
-                    output = "Дамп памяти (первые 50 ячеек):\n"
-                    output += "=" * 50 + "\n"
-                    
-                    cells = root.findall('.//cell')
-                    for i, cell in enumerate(cells[:50]):
-                        addr = cell.get('address')
-                        value = cell.get('value')
-                        output += f"[{addr:4}] = {value}\n"
-                        
-                    if len(cells) > 50:
-                        output += f"... и еще {len(cells) - 50} ячеек\n"
-                        
-                except:
-                    output = xml_content
+                if self.bytecode is None:
+                    messagebox.showwarning("Предупреждение", 
+                                         "Сначала нужно ассемблировать программу!")
+                    self.log_to_console("Ошибка: программа не ассемблирована")
+                    return
+                bytecode = self.bytecode
                     
-                self.memory_output.insert(1.0, output)
-                self.memory_output.config(state=tk.DISABLED)
-                
-                self.notebook.select(1)  # Переключаемся на вкладку дампа памяти
-                self.update_status("Программа выполнена успешно")
-                self.log_to_console("Программа выполнена успешно")
+                # Выполняем программу отрезками, не блокируя цикл событий
+                self.cancel_execution()
+                program = self.assembly_cache.predecoded(bytecode)
+                self.execution = execute_iter(bytecode, data_memory_size=ADDRESS_SPACE,
+                                              memory='paged', program=program)
+                self.execution_program = program
+                self.root.after(0, self.continue_execution)
                 
             else:
                 # Fallback: используем внешний скрипт
@@ -511,9 +728,6 @@ class UVM_GUI:
                     text=True
                 )
                 
-                self.memory_output.config(state=tk.NORMAL)
-                self.memory_output.delete(1.0, tk.END)
-                
                 if result.returncode == 0:
                     # Читаем XML дамп
                     try:
@@ -536,13 +750,12 @@ class UVM_GUI:
                     except Exception as e:
                         output = f"Результат выполнения:\n{result.stdout}\n\nXML дамп:\n{xml_content}"
                         
-                    self.memory_output.insert(1.0, output)
+                    self.memory_view.show_text(output)
                     self.log_to_console("Выполнение через внешний скрипт успешно")
                 else:
-                    self.memory_output.insert(1.0, f"Ошибка:\n{result.stderr}")
+                    self.memory_view.show_text(f"Ошибка:\n{result.stderr}")
                     self.log_to_console(f"Ошибка выполнения: {result.stderr}")
                     
-                self.memory_output.config(state=tk.DISABLED)
                 self.notebook.select(1)
                 
         except FileNotFoundError:
@@ -553,35 +766,162 @@ class UVM_GUI:
             messagebox.showerror("Ошибка выполнения", str(e))
             self.log_to_console(f"Ошибка выполнения: {str(e)}")
             
-    def create_xml_dump(self, memory, addr_range):
-        """Создание XML дампа памяти"""
-        root = ET.Element("memory_dump")
-        meta = ET.SubElement(root, "metadata")
-        ET.SubElement(meta, "total_cells").text = str(len(memory))
-        ET.SubElement(meta, "dump_range").text = addr_range
-        ET.SubElement(meta, "timestamp").text = datetime.now().isoformat()
-        
-        data = ET.SubElement(root, "data")
-        
-        if '-' in addr_range:
-            start, end = map(int, addr_range.split('-'))
-        else:
-            start = end = int(addr_range)
+    def continue_execution(self):
+        """Выполнение следующего отрезка программы"""
+        if self.execution is None:
+            return
+            
+        try:
+            progress = next(self.execution)
+        except Exception as e:
+            self.execution = None
+            messagebox.showerror("Ошибка выполнения", str(e))
+            self.log_to_console(f"Ошибка выполнения: {str(e)}")
+            self.update_status("Ошибка выполнения")
+            return
+            
+        if progress.executed < progress.total:
+            self.update_status(f"Выполнение программы... {progress.executed}/{progress.total} команд "
+                               f"({progress.executed / progress.total:.0%})")
+            self.root.after(1, self.continue_execution)
+            return
+            
+        self.execution.close()
+        self.execution = None
+        program = self.execution_program
+        print_execution_stats(len(program), program.opcodes.count(OP_MAX))
+        self.data_memory = progress.memory
+        self.show_execution_result(progress.memory)
+        self.log_to_console(f"Программа выполнена успешно за {progress.elapsed:.3f} с")
+        
+    def cancel_execution(self):
+        """Прекращение незавершённого выполнения"""
+        if self.execution is not None:
+            self.execution.close()
+            self.execution = None
+            self.update_status("Выполнение прервано")
+            self.log_to_console("Выполнение прервано")
+            
+    def show_execution_result(self, memory):
+        """Вывод памяти после выполнения в виртуальную сетку (без XML)"""
+        self.memory_view.set_memory(memory)
+        
+        self.notebook.select(1)  # Переключаемся на вкладку дампа памяти
+        self.update_status("Программа выполнена успешно")
+        
+    def start_debugging(self):
+        """Запуск отладчика с перемещением во времени для ассемблированной программы"""
+        if not HAS_MODULES:
+            messagebox.showwarning("Предупреждение", "Отладка требует модулей uvm_interp и uvm_debug")
+            return
             
-        start = max(0, start)
-        end = min(len(memory) - 1, end)
-        
-        for addr in range(start, end + 1):
-            cell = ET.SubElement(data, "cell")
-            cell.set("address", str(addr))
-            cell.set("value", str(memory[addr]))
-            cell.set("hex", f"0x{memory[addr]:X}")
+        if self.bytecode is None:
+            messagebox.showwarning("Предупреждение", 
+                                 "Сначала нужно ассемблировать программу!")
+            return
             
-        # Преобразуем в строку с форматированием
-        from xml.dom import minidom
-        xml_str = minidom.parseString(ET.tostring(root)).toprettyxml(indent="  ")
-        return xml_str
+        self.debugger = TimeTravelDebugger(self.assembly_cache.predecoded(self.bytecode))
+        self.debug_shown_ip = None
+        self.log_to_console(f"Отладка: {len(self.debugger)} команд")
+        self.show_debug_state()
+        
+    def debug_step(self):
+        """Выполнение одной команды"""
+        if self.debugger is None:
+            self.start_debugging()
+            return
+        self.debugger.step()
+        self.show_debug_state()
         
+    def debug_step_back(self):
+        """Отмена последней выполненной команды"""
+        if self.debugger is None:
+            return
+        if self.debugger.step_back() == 0 and self.debugger.ip > 0:
+            messagebox.showinfo("Отладка", "Более ранняя история вытеснена")
+        self.show_debug_state()
+        
+    def debug_rewind(self):
+        """Переход к произвольной команде вперёд или назад"""
+        if self.debugger is None:
+            self.start_debugging()
+            if self.debugger is None:
+                return
+                
+        target = simpledialog.askinteger("Перейти к команде", 
+                                         f"Номер команды (0-{len(self.debugger)}):",
+                                         minvalue=0, maxvalue=len(self.debugger),
+                                         initialvalue=self.debugger.ip, parent=self.root)
+        if target is None:
+            return
+            
+        try:
+            self.debugger.rewind_to(target)
+        except ValueError as e:
+            messagebox.showwarning("Отладка", str(e))
+        self.show_debug_state()
+        
+    def debug_run_to_end(self):
+        """Выполнение оставшихся команд с сохранением истории"""
+        if self.debugger is None:
+            self.start_debugging()
+            if self.debugger is None:
+                return
+        self.debugger.run_to()
+        self.show_debug_state()
+        
+    def show_debug_state(self):
+        """Текущая команда и память отлаживаемой программы"""
+        debugger = self.debugger
+        self.data_memory = debugger.memory
+        instruction = debugger.current_instruction() or "программа завершена"
+        
+        note = f"история с команды {debugger.history_start} ({debugger.history_bytes / 1024:.0f} КБ)"
+        if debugger.ip > 0:
+            note += f", последняя: {debugger.describe(debugger.ip - 1)}"
+            
+        # Переход к адресу записи последней (или следующей) команды
+        index = debugger.ip - 1 if debugger.ip > 0 else 0
+        focus = debugger.program.dst[index] if len(debugger) else 0
+        
+        # Изменённые ячейки - адреса записи команд между прошлой и текущей позицией
+        changed = None
+        if self.debug_shown_ip is not None:
+            low, high = sorted((self.debug_shown_ip, debugger.ip))
+            changed = debugger.written_addresses(low, high)
+        self.debug_shown_ip = debugger.ip
+        self.memory_view.set_memory(debugger.memory, focus=focus, note=note, changed=changed)
+        
+        self.notebook.select(1)
+        self.update_status(f"Отладка: команда {debugger.ip}/{len(debugger)} - {instruction}")
+        
+    def export_memory_dump(self):
+        """Экспорт дампа памяти последнего выполнения в файл (XML и другие форматы uvm_dump)"""
+        memory = self.data_memory
+        if memory is None:
+            messagebox.showwarning("Предупреждение", "Сначала нужно выполнить программу!")
+            return
+            
+        addr_range = simpledialog.askstring("Экспорт дампа памяти", "Диапазон адресов:",
+                                            initialvalue=f"0-{len(memory) - 1}", parent=self.root)
+        if not addr_range:
+            return
+            
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".xml",
+            filetypes=[(f"{fmt.upper()} файлы", f"*.{fmt}") for fmt in DUMP_FORMATS] +
+                      [("Все файлы", "*.*")]
+        )
+        if not filename:
+            return
+            
+        try:
+            save_dump(memory, filename, addr_range)
+            self.update_status(f"Дамп памяти сохранен: {os.path.basename(filename)}")
+            self.log_to_console(f"Дамп памяти ({addr_range}) экспортирован в {filename}")
+        except Exception as e:
+            messagebox.showerror("Ошибка экспорта", str(e))
+            
     def run_tests(self):
         """Запуск тестов"""
         self.update_status("Запуск тестов...")
@@ -671,6 +1011,12 @@ class UVM_GUI:
    {"op": "max", "addr_b": B, "addr_c": C, "addr_d": D}
    Пример: {"op": "max", "addr_b": 100, "addr_c": 200, "addr_d": 150}
 
+КОМПАКТНЫЙ СИНТАКСИС (операнды в том же порядке):
+   load_const 100 42
+   read 200 100
+   write 200 5 300
+   max 100 200 150
+
 ПРИМЕЧАНИЯ:
 - Адреса: 0-65535
 - Константы: 0-1048575
@@ -1,6 +1,60 @@
 import argparse
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
+import asyncio
+import mmap
+import os
+import struct
+import time
+from array import array
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import accumulate
+
+from uvm_memory import ADDRESS_SPACE, HAS_NUMPY, MEMORY_BACKENDS, WORD_BITS, allocate_memory, np
+
+# Коды операций УВМ
+OP_READ = 3
+OP_MAX = 7
+OP_LOAD_CONST = 19
+OP_WRITE = 20
+
+OP_NAMES = {
+    OP_LOAD_CONST: 'load_const',
+    OP_READ: 'read',
+    OP_WRITE: 'write',
+    OP_MAX: 'max',
+}
+
+# Суперкоманды, формируемые при загрузке (вне 5-битного пространства кодов)
+OP_FILL = 32
+OP_MAX_CHAIN = 33
+
+# Минимальная длина серии load_const и цепочки max для слияния в суперкоманду
+MIN_FILL_RUN = 4
+MIN_MAX_CHAIN = 3
+
+# Размер одной команды в байтах
+COMMAND_SIZE = 7
+
+# Доступные движки исполнения
+ENGINES = ('table', 'compiled')
+
+# 7-байтовая команда читается как три little-endian поля: 32 + 16 + 8 бит
+_COMMAND_STRUCT = struct.Struct('<IHB')
+
+# Размер окна потокового исполнения в командах. Кратен размеру страницы,
+# поэтому границы окон в байтах (окно * 7) выровнены по страницам.
+STREAM_WINDOW = mmap.PAGESIZE * 16
+
+# Количество команд в одном отрезке execute_iter по умолчанию
+SLICE_BUDGET = 50_000
+
+# Прогресс отрезочного выполнения: выполнено команд, всего команд,
+# затраченное время выполнения (с) и память данных
+ExecutionProgress = namedtuple('ExecutionProgress', 'executed total elapsed memory')
+
+# Размер блока ячеек и буфера файла при записи XML-дампа
+XML_CHUNK = 4096
+XML_BUFFER_SIZE = 1 << 20
 
 def mask(bits):
     """Создание маски для указанного количества бит"""
@@ -39,21 +93,338 @@ def decode_command(command_bytes):
     else:
         return ('unknown', op)
 
-def execute_program(bytecode, data_memory_size=4096, verbose=False):
+class DecodedProgram:
     """
-    Выполнение программы УВМ с поддержкой АЛУ операций
+    Предекодированная программа УВМ в виде столбцов.
+    
+    Для всех команд столбец dst содержит адрес, в который пишется результат:
+      load_const: dst = address,            src1 = constant
+      read:       dst = dst_addr,           src1 = src_addr
+      write:      dst = (base_addr + offset) mod 2^16, src1 = src_addr
+      max:        dst = addr_c,             src1 = addr_b, src2 = addr_d
+    Для неизвестной операции её код хранится в src1.
+    Для суперкоманд (см. fuse_program) src1 - индекс в payloads, src2 - число команд.
     """
-    # Раздельная память: данные отдельно
-    data_memory = [0] * data_memory_size
     
+    def __init__(self, opcodes, dst, src1, src2, payloads=None):
+        self.opcodes = opcodes
+        self.dst = dst
+        self.src1 = src1
+        self.src2 = src2
+        self.payloads = payloads
+    
+    def __len__(self):
+        return len(self.opcodes)
+    
+    def slice(self, start, stop):
+        """Команды [start, stop) как отдельная программа (без суперкоманд)"""
+        return DecodedProgram(self.opcodes[start:stop], self.dst[start:stop],
+                              self.src1[start:stop], self.src2[start:stop])
+
+def predecode(bytecode):
+    """
+    Однократное декодирование всего байткода в столбцы DecodedProgram
+    """
+    count = len(bytecode) // COMMAND_SIZE
+    opcodes = array('B')
+    dst = array('i')
+    src1 = array('i')
+    src2 = array('i')
+    
+    # Неполная команда в конце байткода игнорируется, как и в цикле интерпретации
+    view = memoryview(bytecode)[:count * COMMAND_SIZE]
+    
+    for low, middle, high in _COMMAND_STRUCT.iter_unpack(view):
+        op = low & 0x1F
+        command = low | (middle << 32) | (high << 48)
+        opcodes.append(op)
+        
+        if op == OP_LOAD_CONST:
+            dst.append((command >> 5) & 0xFFFF)
+            src1.append((command >> 21) & 0xFFFFF)
+            src2.append(0)
+        elif op == OP_READ:
+            dst.append((command >> 5) & 0xFFFF)
+            src1.append((command >> 21) & 0xFFFF)
+            src2.append(0)
+        elif op == OP_WRITE:
+            # Адрес записи вычисляется по модулю 2^16 и не выходит за адресное пространство
+            dst.append((((command >> 26) & 0xFFFF) + ((command >> 21) & 0x1F)) & 0xFFFF)
+            src1.append((command >> 5) & 0xFFFF)
+            src2.append(0)
+        elif op == OP_MAX:
+            dst.append((command >> 21) & 0xFFFF)
+            src1.append((command >> 5) & 0xFFFF)
+            src2.append((command >> 37) & 0xFFFF)
+        else:
+            dst.append(0)
+            src1.append(op)
+            src2.append(0)
+    
+    return DecodedProgram(opcodes, dst, src1, src2)
+
+def _op_load_const(memory, dst, constant, _):
+    memory[dst] = constant
+
+def _op_copy(memory, dst, src, _):
+    memory[dst] = memory[src]
+
+def _op_max(memory, dst, addr_b, addr_d):
+    val_b = memory[addr_b]
+    val_d = memory[addr_d]
+    memory[dst] = val_b if val_b >= val_d else val_d
+
+def _op_unknown(memory, _, op, __):
+    print(f"⚠ Неизвестная операция: {op}")
+
+# Таблица обработчиков, индексируемая кодом операции (5 бит)
+_HANDLERS = [_op_unknown] * 32
+_HANDLERS[OP_LOAD_CONST] = _op_load_const
+_HANDLERS[OP_READ] = _op_copy
+_HANDLERS[OP_WRITE] = _op_copy
+_HANDLERS[OP_MAX] = _op_max
+
+def _lane_load_const(cells, dst, constant, _):
+    cells[dst] = constant
+
+def _lane_copy(cells, dst, src, _):
+    cells[dst] = cells[src]
+
+def _lane_max(cells, dst, addr_b, addr_d):
+    np.maximum(cells[addr_b], cells[addr_d], out=cells[dst])
+
+# Таблица обработчиков для памяти ячейки × дорожки (одна строка - ячейка во всех дорожках)
+_LANE_HANDLERS = [_op_unknown] * 32
+_LANE_HANDLERS[OP_LOAD_CONST] = _lane_load_const
+_LANE_HANDLERS[OP_READ] = _lane_copy
+_LANE_HANDLERS[OP_WRITE] = _lane_copy
+_LANE_HANDLERS[OP_MAX] = _lane_max
+
+def run_decoded(program, data_memory, handlers=_HANDLERS):
+    """
+    Выполнение предекодированной программы через таблицу обработчиков
+    """
+    for op, dst, src1, src2 in zip(program.opcodes, program.dst, program.src1, program.src2):
+        handlers[op](data_memory, dst, src1, src2)
+    
+    return data_memory
+
+def fuse_program(program):
+    """
+    Слияние типовых шаблонов в суперкоманды:
+      - серия load_const в последовательные адреса -> OP_FILL (заполнение среза)
+      - цепочка max, где результат каждой команды - операнд следующей,
+        -> OP_MAX_CHAIN (одна свёртка accumulate с записью всех промежуточных результатов)
+    
+    Проход по программе на Python дороже однократного run_decoded, поэтому
+    слияние окупается только при повторном выполнении той же программы
+    (см. uvm_batch).
+    """
+    opcodes, dst, src1, src2 = program.opcodes, program.dst, program.src1, program.src2
+    count = len(program)
+    
+    fused = DecodedProgram(array('B'), array('i'), array('i'), array('i'), [])
+    payloads = fused.payloads
+    
+    def emit(op, target, first, second):
+        fused.opcodes.append(op)
+        fused.dst.append(target)
+        fused.src1.append(first)
+        fused.src2.append(second)
+    
+    i = 0
+    while i < count:
+        op = opcodes[i]
+        
+        if op == OP_LOAD_CONST:
+            j = i + 1
+            while j < count and opcodes[j] == OP_LOAD_CONST and dst[j] == dst[j - 1] + 1:
+                j += 1
+            
+            if j - i >= MIN_FILL_RUN:
+                payloads.append(list(src1[i:j]))
+                emit(OP_FILL, dst[i], len(payloads) - 1, j - i)
+                i = j
+                continue
+        
+        elif op == OP_MAX:
+            # Операнды цепочки читаются до первой записи, поэтому операнд
+            # не должен совпадать с адресом, записанным ранее в той же цепочке
+            written = {dst[i]}
+            others = []
+            j = i + 1
+            while j < count and opcodes[j] == OP_MAX:
+                link = dst[j - 1]
+                if src1[j] == link:
+                    other = src2[j]
+                elif src2[j] == link:
+                    other = src1[j]
+                else:
+                    break
+                if other in written:
+                    break
+                others.append(other)
+                written.add(dst[j])
+                j += 1
+            
+            if j - i >= MIN_MAX_CHAIN:
+                payloads.append((src1[i], src2[i], others, list(dst[i:j])))
+                emit(OP_MAX_CHAIN, dst[i], len(payloads) - 1, j - i)
+                i = j
+                continue
+        
+        emit(op, dst[i], src1[i], src2[i])
+        i += 1
+    
+    return fused
+
+def _fused_handlers(payloads, data_memory):
+    """Таблица обработчиков, дополненная суперкомандами для конкретной памяти"""
+    size = len(data_memory)
+    
+    # Срез array.array можно присвоить только массивом того же типа
+    if isinstance(data_memory, array):
+        fills = [array(data_memory.typecode, payload) if isinstance(payload, list) else None
+                 for payload in payloads]
+    else:
+        fills = payloads
+    
+    def op_fill(memory, dst, index, count):
+        if dst + count > size:
+            raise IndexError("индекс памяти вне диапазона")
+        memory[dst:dst + count] = fills[index]
+    
+    def op_max_chain(memory, dst, index, count):
+        addr_b, addr_d, others, targets = payloads[index]
+        values = [memory[addr_b], memory[addr_d]]
+        values.extend([memory[addr] for addr in others])
+        
+        results = accumulate(values, max)
+        next(results)
+        for target, value in zip(targets, results):
+            memory[target] = value
+    
+    return _HANDLERS + [op_fill, op_max_chain]
+
+def run_fused(program, data_memory):
+    """
+    Выполнение программы после fuse_program
+    """
+    return run_decoded(program, data_memory, _fused_handlers(program.payloads, data_memory))
+
+def execute_lanes(bytecode, initial_memory):
+    """
+    Векторное выполнение одной программы над N начальными образами памяти.
+    
+    initial_memory - двумерный массив NumPy (дорожки × ячейки). Каждая команда
+    выполняется сразу во всех дорожках; возвращается массив той же формы.
+    """
+    if not HAS_NUMPY:
+        raise RuntimeError("Для векторного выполнения требуется установленный NumPy")
+    
+    initial_memory = np.asarray(initial_memory)
+    if initial_memory.ndim != 2:
+        raise ValueError(f"Ожидается массив дорожки × ячейки, получена размерность {initial_memory.ndim}")
+    
+    # Транспонированная копия: значения одной ячейки во всех дорожках лежат подряд
+    cells = np.ascontiguousarray(initial_memory.T)
+    
+    program = bytecode if isinstance(bytecode, DecodedProgram) else predecode(bytecode)
+    run_decoded(program, cells, _LANE_HANDLERS)
+    
+    return cells.T
+
+@contextmanager
+def open_bytecode(path):
+    """
+    Отображение бинарного файла в память (mmap) без чтения целиком.
+    Возвращает memoryview, из которого команды декодируются без копирования.
+    """
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            # Пустой файл нельзя отобразить через mmap
+            yield memoryview(b'')
+            return
+        
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            with memoryview(mapped) as view:
+                yield view
+        finally:
+            mapped.close()
+
+def execute_stream(path, data_memory, window=STREAM_WINDOW, trace=None, checkpoint=None):
+    """
+    Потоковое выполнение бинарного файла через mmap.
+    
+    Программа предекодируется и выполняется окнами по window команд;
+    страницы обработанного окна сразу возвращаются системе, поэтому
+    пиковое потребление памяти не зависит от размера программы.
+    trace - uvm_trace.TraceRecorder для записи событий выполнения.
+    checkpoint - uvm_checkpoint.Checkpointer: точки сохраняются между окнами,
+                 при checkpoint.resume выполнение продолжается с последней точки.
+    Возвращает (количество команд, количество операций MAX) начиная с точки продолжения.
+    """
+    if trace is not None:
+        from uvm_trace import run_traced
+    
+    first = checkpoint.restore(data_memory) if checkpoint is not None else 0
+    
+    command_count = 0
+    max_operations = 0
+    
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size < COMMAND_SIZE:
+            return command_count, max_operations
+        
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            release = hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_DONTNEED')
+            
+            total = size // COMMAND_SIZE
+            with memoryview(mapped) as view:
+                # Границы окон кратны window, поэтому после продолжения с
+                # произвольной команды первое окно укорачивается
+                start = first
+                while start < total:
+                    stop = min((start // window + 1) * window, total)
+                    program = predecode(view[start * COMMAND_SIZE:stop * COMMAND_SIZE])
+                    if trace is not None:
+                        run_traced(program, data_memory, trace, start)
+                    else:
+                        run_decoded(program, data_memory)
+                    
+                    command_count += len(program)
+                    max_operations += program.opcodes.count(OP_MAX)
+                    
+                    if checkpoint is not None:
+                        if stop == total:
+                            checkpoint.save(stop, data_memory)
+                        else:
+                            checkpoint.maybe_save(stop, data_memory)
+                    
+                    if release:
+                        # Смещение для madvise выравнивается вниз по границе страницы
+                        offset = start * COMMAND_SIZE // mmap.PAGESIZE * mmap.PAGESIZE
+                        mapped.madvise(mmap.MADV_DONTNEED, offset, stop * COMMAND_SIZE - offset)
+                    start = stop
+        finally:
+            mapped.close()
+    
+    return command_count, max_operations
+
+def interpret_bytecode(bytecode, data_memory):
+    """
+    Эталонный цикл интерпретации: декодирование каждой команды на лету.
+    Возвращает (количество команд, количество операций MAX).
+    """
     # Память команд - это сам байткод
     code_memory = bytecode
     
-    if verbose:
-        print(f"⚙  Настройки исполнения:")
-        print(f"   Загружено команд: {len(code_memory) // 7}")
-        print(f"   Память данных: {data_memory_size} ячеек")
-    
     # Основной цикл интерпретации
     ip = 0  # Instruction Pointer
     command_count = 0
@@ -75,119 +446,258 @@ def execute_program(bytecode, data_memory_size=4096, verbose=False):
         if op == 'load_const':
             _, address, constant = decoded_cmd
             data_memory[address] = constant
-            if verbose and command_count < 10:
-                print(f"  [{command_count:3}] load_const: memory[{address}] = {constant}")
             
         elif op == 'read':
             _, dst_addr, src_addr = decoded_cmd
             data_memory[dst_addr] = data_memory[src_addr]
-            if verbose and command_count < 10:
-                print(f"  [{command_count:3}] read: memory[{dst_addr}] = memory[{src_addr}] = {data_memory[dst_addr]}")
             
         elif op == 'write':
             _, src_addr, offset, base_addr = decoded_cmd
-            target_addr = base_addr + offset
+            target_addr = (base_addr + offset) & mask(16)
             data_memory[target_addr] = data_memory[src_addr]
-            if verbose and command_count < 10:
-                print(f"  [{command_count:3}] write: memory[{target_addr}] = memory[{src_addr}] = {data_memory[target_addr]}")
             
         elif op == 'max':
             _, addr_b, addr_c, addr_d = decoded_cmd
             val_b = data_memory[addr_b]
             val_d = data_memory[addr_d]
-            result = max(val_b, val_d)
-            data_memory[addr_c] = result
+            data_memory[addr_c] = max(val_b, val_d)
             max_operations += 1
             
-            if verbose:
-                print(f"  [{command_count:3}] 🔷 MAX операция:")
-                print(f"       addr_b[{addr_b}] = {val_b}")
-                print(f"       addr_d[{addr_d}] = {val_d}")
-                print(f"       max({val_b}, {val_d}) = {result}")
-                print(f"       ➡ Результат в memory[{addr_c}] = {result}")
-            
         elif op == 'unknown':
             print(f"⚠ Неизвестная операция: {decoded_cmd[1]}")
             
         ip += 7
         command_count += 1
     
+    return command_count, max_operations
+
+def execute_program(bytecode, data_memory_size=ADDRESS_SPACE, verbose=False, engine='table',
+                    memory='list', word_bits=32, program=None, trace=None, checkpoint=None,
+                    breakpoints=None, watchpoints=None, on_stop=None):
+    """
+    Выполнение программы УВМ с поддержкой АЛУ операций
+    
+    engine: 'table' - предекодирование и таблица обработчиков,
+            'compiled' - программа компилируется в функцию Python (uvm_codegen)
+    memory, word_bits: представление памяти данных (см. uvm_memory.allocate_memory)
+    program: уже предекодированная программа (например, из uvm_cache)
+    trace: uvm_trace.TraceRecorder для записи событий выполнения.
+           При verbose без trace выводятся последние события из кольцевого буфера.
+    checkpoint: uvm_checkpoint.Checkpointer - выполнение отрезками с контрольными
+                точками (движок 'table'), при checkpoint.resume - с последней точки.
+    breakpoints, watchpoints: номера команд и uvm_breakpoints.Watchpoint - выполнение
+                до каждой остановки без инструментирования, on_stop(event) вызывается
+                на остановках (по умолчанию - вывод события). Без них работает обычный цикл.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Неизвестный движок исполнения: {engine}")
+    if (breakpoints or watchpoints) and (trace is not None or checkpoint is not None):
+        raise ValueError("Точки останова и наблюдения не совмещаются с трассировкой и контрольными точками")
+    if checkpoint is not None and (verbose or trace is not None):
+        raise ValueError("Контрольные точки не совмещаются с подробным выводом и трассировкой")
+    
+    # Раздельная память: данные отдельно
+    data_memory = allocate_memory(data_memory_size, memory, word_bits)
+    
+    if verbose:
+        print(f"⚙  Настройки исполнения:")
+        print(f"   Загружено команд: {len(bytecode) // 7}")
+        print(f"   Память данных: {data_memory_size} ячеек ({memory})")
+    
+    if breakpoints or watchpoints:
+        from uvm_breakpoints import run_with_stops
+        
+        if program is None:
+            program = predecode(bytecode)
+        executed = run_with_stops(program, data_memory, breakpoints or (), watchpoints or (), on_stop)
+        if executed < len(program):
+            print(f"⏸  Выполнение остановлено перед командой {executed}")
+        command_count = executed
+        max_operations = program.opcodes[:executed].count(OP_MAX)
+    elif verbose or trace is not None:
+        from uvm_trace import TraceRecorder, print_events, run_traced
+        
+        # Трассировка требует пошагового исполнения без суперкоманд
+        recorder = trace if trace is not None else TraceRecorder()
+        if program is None:
+            program = predecode(bytecode)
+        run_traced(program, data_memory, recorder)
+        command_count = len(program)
+        max_operations = program.opcodes.count(OP_MAX)
+        
+        if verbose:
+            print_events(recorder.events())
+    elif checkpoint is not None:
+        from uvm_checkpoint import run_checkpointed
+        
+        if program is None:
+            program = predecode(bytecode)
+        start = run_checkpointed(program, data_memory, checkpoint)
+        if start:
+            print(f"♻  Выполнение продолжено с команды {start} (контрольная точка)")
+        command_count = len(program)
+        max_operations = program.opcodes.count(OP_MAX)
+    elif engine == 'compiled':
+        from uvm_codegen import compile_program
+        
+        run = compile_program(bytecode)
+        run(data_memory)
+        command_count = run.command_count
+        max_operations = run.max_operations
+    else:
+        if program is None:
+            program = predecode(bytecode)
+        run_decoded(program, data_memory)
+        command_count = len(program)
+        max_operations = program.opcodes.count(OP_MAX)
+    
+    print_execution_stats(command_count, max_operations)
+    
+    return data_memory
+
+def execute_iter(bytecode, data_memory_size=ADDRESS_SPACE, memory='list', word_bits=32,
+                 program=None, budget=SLICE_BUDGET, data_memory=None, start=0):
+    """
+    Выполнение программы УВМ отрезками по budget команд.
+    
+    Генератор: после каждого отрезка выдаёт ExecutionProgress и
+    приостанавливается до следующего next(), поэтому выполнение можно
+    чередовать с другой работой (например, с циклом событий GUI).
+    Прекращение - generator.close() или просто отказ от итерации.
+    Продолжение в другом генераторе - data_memory и start=progress.executed.
+    """
+    if budget <= 0:
+        raise ValueError(f"Размер отрезка должен быть положительным: {budget}")
+    
+    if program is None:
+        program = predecode(bytecode)
+    if data_memory is None:
+        data_memory = allocate_memory(data_memory_size, memory, word_bits)
+    
+    total = len(program)
+    elapsed = 0.0
+    for begin in range(start, total, budget):
+        end = min(begin + budget, total)
+        started = time.perf_counter()
+        run_decoded(program.slice(begin, end), data_memory)
+        elapsed += time.perf_counter() - started
+        yield ExecutionProgress(end, total, elapsed, data_memory)
+    
+    if start >= total:
+        yield ExecutionProgress(total, total, elapsed, data_memory)
+
+async def execute_async(bytecode, data_memory_size=ADDRESS_SPACE, memory='list', word_bits=32,
+                        program=None, budget=SLICE_BUDGET, on_progress=None):
+    """
+    Выполнение программы в asyncio: после каждого отрезка управление
+    отдаётся циклу событий. Отмена задачи прерывает выполнение между
+    отрезками. on_progress(progress) вызывается после каждого отрезка.
+    Возвращает память данных.
+    """
+    data_memory = None
+    for progress in execute_iter(bytecode, data_memory_size, memory, word_bits, program, budget):
+        data_memory = progress.memory
+        if on_progress is not None:
+            on_progress(progress)
+        await asyncio.sleep(0)
+    return data_memory
+
+def engine_uses_predecoded(engine, verbose=False):
+    """Использует ли выбранный режим исполнения предекодированную программу"""
+    return engine == 'table' or verbose
+
+def print_execution_stats(command_count, max_operations):
+    """Вывод статистики выполнения"""
     print(f"\n📊 Статистика выполнения:")
     print(f"   Всего команд: {command_count}")
     print(f"   Операций MAX: {max_operations}")
+
+def parse_address_ranges(addr_range):
+    """
+    Разбор диапазонов адресов вида "500-511,600-604,700" в список (start, end)
+    """
+    ranges = []
+    for part in addr_range.split(','):
+        part = part.strip()
+        if '-' in part:
+            start, end = map(int, part.split('-'))
+            ranges.append((start, end))
+        else:
+            addr = int(part)
+            ranges.append((addr, addr))
+    return ranges
+
+def xml_cell_lines(memory, start, end, indent="    "):
+    """
+    Строки элементов <cell/> для адресов start..end включительно.
+    Память читается блоками по XML_CHUNK ячеек, поэтому расход памяти
+    не зависит от размера диапазона.
+    """
+    for chunk_start in range(start, end + 1, XML_CHUNK):
+        chunk_end = min(chunk_start + XML_CHUNK, end + 1)
+        values = memory[chunk_start:chunk_end]
+        if hasattr(values, 'tolist'):
+            values = values.tolist()
+        
+        yield ''.join(f'{indent}<cell address="{addr}" value="{value}" hex="0x{value:X}"/>\n'
+                      for addr, value in zip(range(chunk_start, chunk_end), values))
+
+def write_xml_dump(file, memory, ranges):
+    """
+    Потоковая запись XML-дампа в открытый текстовый файл.
+    Структура и форматирование совпадают с выводом minidom.toprettyxml(indent="  ").
+    """
+    file.write('<?xml version="1.0" ?>\n<memory_dump>\n  <metadata>\n')
+    file.write(f'    <total_cells>{len(memory)}</total_cells>\n')
+    file.write(f'    <ranges_count>{len(ranges)}</ranges_count>\n  </metadata>\n')
     
-    return data_memory
+    for i, (start, end) in enumerate(ranges):
+        # Корректировка границ
+        start = max(0, start)
+        end = min(len(memory) - 1, end)
+        
+        element = f'  <range id="{i}" start="{start}" end="{end}" size="{end - start + 1}"'
+        if end < start:
+            file.write(element + '/>\n')
+            continue
+        
+        file.write(element + '>\n')
+        file.writelines(xml_cell_lines(memory, start, end))
+        file.write('  </range>\n')
+    
+    file.write('</memory_dump>\n')
 
 def save_xml_dump(memory, output_file, addr_range):
     """
     Сохранение дампа памяти в формате XML
     """
     try:
-        # Поддержка нескольких диапазонов через запятую
-        ranges = []
-        if ',' in addr_range:
-            range_parts = addr_range.split(',')
-            for part in range_parts:
-                if '-' in part:
-                    start, end = map(int, part.strip().split('-'))
-                    ranges.append((start, end))
-                else:
-                    addr = int(part.strip())
-                    ranges.append((addr, addr))
-        else:
-            if '-' in addr_range:
-                start, end = map(int, addr_range.split('-'))
-                ranges.append((start, end))
-            else:
-                addr = int(addr_range)
-                ranges.append((addr, addr))
-        
-        # Создание XML структуры
-        root = ET.Element("memory_dump")
-        
-        # Добавление метаинформации
-        meta = ET.SubElement(root, "metadata")
-        ET.SubElement(meta, "total_cells").text = str(len(memory))
-        ET.SubElement(meta, "ranges_count").text = str(len(ranges))
-        
-        # Добавление данных памяти для каждого диапазона
-        for i, (start, end) in enumerate(ranges):
-            # Корректировка границ
-            start = max(0, start)
-            end = min(len(memory) - 1, end)
-            
-            range_elem = ET.SubElement(root, "range")
-            range_elem.set("id", str(i))
-            range_elem.set("start", str(start))
-            range_elem.set("end", str(end))
-            range_elem.set("size", str(end - start + 1))
-            
-            for addr in range(start, end + 1):
-                cell = ET.SubElement(range_elem, "cell")
-                cell.set("address", str(addr))
-                cell.set("value", str(memory[addr]))
-                cell.set("hex", f"0x{memory[addr]:X}")
-        
-        # Форматирование и сохранение XML
-        xml_str = minidom.parseString(ET.tostring(root)).toprettyxml(indent="  ")
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(xml_str)
-        
-        print(f"✅ Дамп памяти сохранен в {output_file}")
-        
-        # Показать краткий дамп
-        print(f"\n📊 Краткий дамп (первые 2 диапазона):")
-        for i, (start, end) in enumerate(ranges[:2]):
-            print(f"\n  Диапазон {i+1}: {start}-{end}")
-            for addr in range(start, min(start + 5, end + 1)):
-                print(f"    [{addr:4}] = {memory[addr]:8} (0x{memory[addr]:X})")
-            if end - start > 5:
-                print(f"    ... ({end - start - 4} more cells)")
-                
+        write_xml_dump_file(memory, output_file, addr_range)
     except Exception as e:
         print(f"❌ Ошибка при сохранении дампа: {e}")
 
+def write_xml_dump_file(memory, output_file, addr_range):
+    """
+    Запись XML-дампа в файл с кратким выводом; ошибки передаются вызывающему
+    """
+    # Поддержка нескольких диапазонов через запятую
+    ranges = parse_address_ranges(addr_range)
+    
+    # Ячейки пишутся по мере обхода памяти в буферизованный файл
+    with open(output_file, 'w', encoding='utf-8', buffering=XML_BUFFER_SIZE) as f:
+        write_xml_dump(f, memory, ranges)
+    
+    print(f"✅ Дамп памяти сохранен в {output_file}")
+    
+    # Показать краткий дамп
+    print(f"\n📊 Краткий дамп (первые 2 диапазона):")
+    for i, (start, end) in enumerate(ranges[:2]):
+        print(f"\n  Диапазон {i+1}: {start}-{end}")
+        for addr in range(start, min(start + 5, end + 1)):
+            print(f"    [{addr:4}] = {memory[addr]:8} (0x{memory[addr]:X})")
+        if end - start > 5:
+            print(f"    ... ({end - start - 4} more cells)")
+
 def create_test_program_max():
     """
     Создание тестовой программы для команды max()
@@ -308,6 +818,40 @@ def main():
                        help='Создать тестовую программу для векторов')
     parser.add_argument('-v', '--verbose', action='store_true',
                        help='Подробный вывод выполнения команд')
+    parser.add_argument('--engine', choices=ENGINES, default='table',
+                       help='Движок исполнения: таблица обработчиков или компиляция в Python')
+    parser.add_argument('--memory', choices=MEMORY_BACKENDS, default='list',
+                       help='Представление памяти данных (paged - разреженная, страницы по мере записи)')
+    parser.add_argument('--word-bits', type=int, choices=WORD_BITS, default=32,
+                       help='Разрядность ячейки памяти для представлений array и numpy')
+    parser.add_argument('--stream', action='store_true',
+                       help='Потоковое выполнение окнами через mmap (память не зависит от размера программы)')
+    parser.add_argument('--cache', action='store_true',
+                       help='Брать предекодированную программу из дискового кеша (__uvmcache__ или $UVM_CACHE_DIR)')
+    parser.add_argument('--trace', required=False,
+                       help='Записать трассу выполнения в двоичный файл (просмотр: python uvm_trace.py FILE)')
+    parser.add_argument('--trace-ring', type=int, default=None,
+                       help='Размер кольцевого буфера событий, выводимого после выполнения (по умолчанию 32 при -v)')
+    parser.add_argument('--profile', required=False,
+                       help='Профилировать программу и сохранить отчёт в JSON-файл')
+    parser.add_argument('--checkpoint', required=False,
+                       help='Каталог контрольных точек (полный снимок и разности изменённых страниц)')
+    parser.add_argument('--checkpoint-every', type=int, default=None,
+                       help='Количество команд между контрольными точками (по умолчанию 5000000)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Продолжить выполнение с последней контрольной точки (требует --checkpoint)')
+    parser.add_argument('--break', dest='breakpoints', required=False,
+                       help='Точки останова: номера команд через запятую (например: "10,200")')
+    parser.add_argument('--watch', required=False,
+                       help='Точки наблюдения: диапазоны адресов с видом r/w/rw (например: "500-511:w,600:r")')
+    parser.add_argument('--dump-format', choices=('xml', 'bin', 'npy', 'csv', 'jsonl'), default=None,
+                       help='Формат дампа памяти (по умолчанию - по расширению файла, иначе xml)')
+    parser.add_argument('--rle', action='store_true',
+                       help='Сжимать серии нулей в дампе памяти')
+    parser.add_argument('--batch', required=False,
+                       help='Пакетный режим: каталог с *.bin или файл-манифест со списком программ')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                       help='Количество рабочих процессов для пакетного режима')
     
     args = parser.parse_args()
     
@@ -345,6 +889,16 @@ def main():
         print("2. Запустите: python uvm_interp.py -i test_vectors.bin -o vectors_dump.xml -r 1000-1004,1010-1014,1020-1024,1030-1033 -v")
         return
     
+    # Пакетный режим: результаты в JSON lines (-o), диапазоны дампа (-r) необязательны
+    if args.batch:
+        from uvm_batch import run_batch
+        from uvm_cache import default_cache_dir
+        
+        run_batch(args.batch, output=args.output, addr_range=args.range, jobs=args.jobs,
+                  data_memory_size=ADDRESS_SPACE, memory=args.memory, word_bits=args.word_bits,
+                  cache_dir=default_cache_dir() if args.cache else None)
+        return
+    
     # Основной режим работы
     if not all([args.input, args.output, args.range]):
         print("Использование:")
@@ -352,26 +906,133 @@ def main():
         print("  python uvm_interp.py --test-max           # Создать тест MAX")
         print("  python uvm_interp.py --test-vectors      # Создать тест векторов")
         print("  python uvm_interp.py -i file.bin -o dump.xml -r range -v  # Подробный вывод")
+        print("  python uvm_interp.py -i file.bin -o dump.xml -r range --trace run.trace  # Трасса выполнения")
+        print("  python uvm_interp.py -i file.bin -o dump.xml -r range --profile profile.json  # Профиль")
+        print("  python uvm_interp.py -i file.bin -o dump.xml -r range --break 10 --watch 500-511:w  # Остановки")
+        print("  python uvm_interp.py -i file.bin -o dump.npy -r range --rle  # Дамп в .npy, нули сжаты")
+        print("  python uvm_interp.py -i file.bin -o dump.xml -r range --checkpoint ckpt/ --resume  # Возобновление")
+        print("  python uvm_interp.py --batch programs/ -o results.jsonl -r range -j 8  # Пакетный режим")
         return
     
     print("🚀 Запуск интерпретатора УВМ с поддержкой АЛУ")
     print("=" * 60)
     
+    if args.resume and not args.checkpoint:
+        print("❌ --resume требует --checkpoint DIR")
+        return
+    
+    if args.trace_ring is not None and args.trace_ring <= 0:
+        print("❌ --trace-ring должен быть положительным")
+        return
+    
+    if args.checkpoint_every is not None and args.checkpoint_every <= 0:
+        print("❌ --checkpoint-every должен быть положительным")
+        return
+    
+    if args.profile and (args.stream or args.checkpoint or args.verbose
+                         or args.trace or args.trace_ring):
+        print("❌ --profile не совмещается с --stream, --checkpoint, -v и трассировкой")
+        return
+    
+    if args.checkpoint and (args.verbose or args.trace or args.trace_ring):
+        print("❌ --checkpoint не совмещается с -v, --trace и --trace-ring")
+        return
+    
+    if (args.breakpoints or args.watch) and (args.stream or args.profile or args.checkpoint
+                                              or args.trace or args.trace_ring):
+        print("❌ --break и --watch не совмещаются с --stream, --profile, --checkpoint и трассировкой")
+        return
+    
+    trace = None
     try:
-        # Чтение байткода
-        with open(args.input, "rb") as file:
-            bytecode = file.read()
+        checkpoint = None
+        if args.checkpoint:
+            from uvm_checkpoint import CHECKPOINT_EVERY, Checkpointer, program_fingerprint
+            
+            with open_bytecode(args.input) as bytecode:
+                fingerprint = program_fingerprint(bytecode)
+            checkpoint = Checkpointer(args.checkpoint, fingerprint,
+                                      every=args.checkpoint_every or CHECKPOINT_EVERY,
+                                      resume=args.resume)
         
-        print(f"📦 Загружен файл: {args.input}")
-        print(f"   Размер: {len(bytecode)} байт")
+        breakpoints = watchpoints = None
+        if args.breakpoints or args.watch:
+            from uvm_breakpoints import parse_breakpoints, parse_watchpoints
+            
+            breakpoints = parse_breakpoints(args.breakpoints or '')
+            watchpoints = parse_watchpoints(args.watch or '')
         
-        # Выполнение программы
-        print("\n⚡ Выполнение программы с АЛУ операциями...")
-        data_memory = execute_program(bytecode, data_memory_size=2048, verbose=args.verbose)
+        if args.trace or args.trace_ring:
+            from uvm_trace import DEFAULT_RING_SIZE, TraceRecorder, print_events
+            
+            trace = TraceRecorder(args.trace_ring or DEFAULT_RING_SIZE, args.trace)
+        
+        if args.stream:
+            print(f"📦 Потоковое выполнение файла: {args.input}")
+            print(f"   Размер: {os.path.getsize(args.input)} байт")
+            
+            print("\n⚡ Выполнение программы с АЛУ операциями...")
+            data_memory = allocate_memory(ADDRESS_SPACE, args.memory, args.word_bits)
+            print_execution_stats(*execute_stream(args.input, data_memory, trace=trace,
+                                                  checkpoint=checkpoint))
+        else:
+            # Байткод отображается в память через mmap, без копирования
+            with open_bytecode(args.input) as bytecode:
+                print(f"📦 Загружен файл: {args.input}")
+                print(f"   Размер: {len(bytecode)} байт")
+                
+                program = None
+                if args.cache and (args.profile or breakpoints or watchpoints or
+                                   engine_uses_predecoded(args.engine, args.verbose or trace is not None)):
+                    from uvm_cache import AssemblyCache
+                    
+                    cache = AssemblyCache()
+                    program = cache.predecoded(bytecode)
+                    if cache.hits:
+                        print(f"   ♻  Предекодированная программа взята из кеша")
+                
+                # Выполнение программы
+                print("\n⚡ Выполнение программы с АЛУ операциями...")
+                if args.profile:
+                    from uvm_profile import print_profile, profile_program, save_profile
+                    
+                    if program is None:
+                        program = predecode(bytecode)
+                    data_memory, report = profile_program(program, ADDRESS_SPACE, args.memory,
+                                                          args.word_bits)
+                    report['program'] = args.input
+                    print_execution_stats(len(program), program.opcodes.count(OP_MAX))
+                    print_profile(report)
+                    save_profile(report, args.profile)
+                    print(f"   Отчёт профилировщика сохранен в {args.profile}")
+                else:
+                    data_memory = execute_program(bytecode, data_memory_size=ADDRESS_SPACE,
+                                                  verbose=args.verbose, engine=args.engine,
+                                                  memory=args.memory,
+                                                  word_bits=args.word_bits, program=program,
+                                                  trace=trace, checkpoint=checkpoint,
+                                                  breakpoints=breakpoints, watchpoints=watchpoints)
+        
+        if checkpoint is not None:
+            print(f"💾 Контрольных точек записано: {checkpoint.saved} ({args.checkpoint})")
+        
+        if trace is not None:
+            trace.close()
+            if args.trace_ring and not (args.verbose and not args.stream):
+                print_events(trace.events())
+            if args.trace:
+                print(f"\n🧾 Трасса ({trace.count} событий) сохранена в {args.trace}")
         
         # Сохранение дампа памяти
         print("\n💾 Сохранение дампа памяти...")
-        save_xml_dump(data_memory, args.output, args.range)
+        from uvm_dump import save_dump
+        
+        try:
+            save_dump(data_memory, args.output, args.range, args.dump_format, args.rle,
+                      args.word_bits)
+        except Exception as e:
+            print(f"❌ Ошибка при сохранении дампа: {e}")
+            return
         
         print("\n✅ Интерпретатор с АЛУ завершил работу успешно!")
         
@@ -379,6 +1040,9 @@ def main():
         print(f"❌ Файл не найден: {args.input}")
     except Exception as e:
         print(f"❌ Ошибка выполнения: {e}")
+    finally:
+        if trace is not None:
+            trace.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
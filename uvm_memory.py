@@ -0,0 +1,184 @@
+"""
+Модели памяти данных Учебной Виртуальной Машины (УВМ)
+"""
+
+from array import array
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+# Доступные представления памяти данных
+MEMORY_BACKENDS = ('list', 'array', 'numpy', 'paged')
+
+# Полное адресное пространство данных: адреса в командах 16-битные,
+# адрес записи write (base_addr + offset) вычисляется по модулю 2^16
+ADDRESS_SPACE = 1 << 16
+
+# Размер страницы разреженной памяти (в ячейках)
+PAGE_BITS = 8
+PAGE_SIZE = 1 << PAGE_BITS
+_PAGE_MASK = PAGE_SIZE - 1
+
+# Общая нулевая страница: все нетронутые страницы ссылаются на неё
+_ZERO_PAGE = (0,) * PAGE_SIZE
+
+# Поддерживаемая разрядность ячейки: константы кодируются 20 битами,
+# поэтому меньшая разрядность не подходит
+_ARRAY_TYPECODES = {32: 'i', 64: 'q'}
+_NUMPY_DTYPES = {32: 'int32', 64: 'int64'}
+WORD_BITS = tuple(_ARRAY_TYPECODES)
+
+class PagedMemory:
+    """
+    Разреженная память данных из страниц по PAGE_SIZE ячеек.
+
+    Нетронутые страницы ссылаются на общую нулевую страницу и читаются
+    как нули; страница выделяется (список целых) при первой записи.
+    Поддерживает индексацию и срезы как list, поэтому работает со всеми
+    движками исполнения, а дампы и снимки обходят только выделенные страницы.
+    """
+
+    def __init__(self, size=ADDRESS_SPACE):
+        self.size = size
+        self._pages = [_ZERO_PAGE] * ((size + _PAGE_MASK) >> PAGE_BITS)
+
+    def __len__(self):
+        return self.size
+
+    def _check(self, address):
+        if address < 0:
+            address += self.size
+        if not 0 <= address < self.size:
+            raise IndexError("индекс памяти вне диапазона")
+        return address
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.size)
+            if step != 1:
+                return [self[address] for address in range(start, stop, step)]
+
+            # Копирование постранично
+            cells = []
+            while start < stop:
+                offset = start & _PAGE_MASK
+                count = min(PAGE_SIZE - offset, stop - start)
+                cells.extend(self._pages[start >> PAGE_BITS][offset:offset + count])
+                start += count
+            return cells
+
+        if not 0 <= key < self.size:
+            key = self._check(key)
+        return self._pages[key >> PAGE_BITS][key & _PAGE_MASK]
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            addresses = range(*key.indices(self.size))
+            values = list(value)
+            if len(values) != len(addresses):
+                raise ValueError("размер среза памяти изменять нельзя")
+            if addresses.step != 1:
+                for address, cell in zip(addresses, values):
+                    self[address] = cell
+                return
+
+            # Запись постранично
+            start, stop = addresses.start, addresses.stop
+            position = 0
+            while start < stop:
+                offset = start & _PAGE_MASK
+                count = min(PAGE_SIZE - offset, stop - start)
+                page = self._page_for_write(start >> PAGE_BITS)
+                page[offset:offset + count] = values[position:position + count]
+                position += count
+                start += count
+            return
+
+        if not 0 <= key < self.size:
+            key = self._check(key)
+        page = self._pages[key >> PAGE_BITS]
+        if page is _ZERO_PAGE:
+            page = self._page_for_write(key >> PAGE_BITS)
+        page[key & _PAGE_MASK] = value
+
+    def _page_for_write(self, index):
+        """Страница для записи (выделяется при первом обращении)"""
+        page = self._pages[index]
+        if page is _ZERO_PAGE:
+            page = self._pages[index] = list(_ZERO_PAGE)
+        return page
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def is_zero_page(self, index):
+        """Страница index не выделялась (все ячейки нулевые)"""
+        return self._pages[index] is _ZERO_PAGE
+
+    def iter_pages(self):
+        """Выделенные страницы: пары (адрес первой ячейки, список ячеек)"""
+        for index, page in enumerate(self._pages):
+            if page is not _ZERO_PAGE:
+                yield index << PAGE_BITS, page
+
+    @property
+    def populated_pages(self):
+        return sum(1 for page in self._pages if page is not _ZERO_PAGE)
+
+    def tolist(self):
+        return self[:]
+
+def allocate_memory(size, backend='list', word_bits=32):
+    """
+    Создание обнулённой памяти данных.
+
+    list  - список целых Python (по умолчанию)
+    array - array.array со знаковыми ячейками word_bits бит
+    numpy - одномерный массив NumPy со знаковыми ячейками word_bits бит
+    paged - разреженная PagedMemory: страницы выделяются при первой записи
+    """
+    if backend == 'list':
+        return [0] * size
+    elif backend == 'paged':
+        return PagedMemory(size)
+
+    if word_bits not in _ARRAY_TYPECODES:
+        raise ValueError(f"Неподдерживаемая разрядность ячейки: {word_bits} "
+                         f"(допустимо: {', '.join(map(str, WORD_BITS))})")
+
+    if backend == 'array':
+        return array(_ARRAY_TYPECODES[word_bits], bytes(size * word_bits // 8))
+    elif backend == 'numpy':
+        if not HAS_NUMPY:
+            raise RuntimeError("Для памяти 'numpy' требуется установленный NumPy")
+        return np.zeros(size, dtype=_NUMPY_DTYPES[word_bits])
+    else:
+        raise ValueError(f"Неизвестное представление памяти: {backend}")
+
+def memory_buffer(memory):
+    """
+    Экспорт памяти через buffer protocol без копирования
+    """
+    if isinstance(memory, (list, PagedMemory)):
+        raise TypeError("Память 'list' и 'paged' не поддерживают buffer protocol, "
+                        "используйте представление 'array' или 'numpy'")
+    return memoryview(memory)
+
+def memory_to_numpy(memory):
+    """
+    Представление памяти как массива NumPy (без копирования для array и numpy)
+    """
+    if not HAS_NUMPY:
+        raise RuntimeError("Требуется установленный NumPy")
+
+    if isinstance(memory, np.ndarray):
+        return memory
+    if isinstance(memory, array):
+        return np.frombuffer(memory, dtype=memory.typecode)
+    if isinstance(memory, PagedMemory):
+        memory = memory.tolist()
+    return np.asarray(memory, dtype=np.int64)
@@ -0,0 +1,156 @@
+"""
+Профилировщик программ УВМ (уровень гостевой программы).
+
+Программа УВМ не содержит переходов: каждая команда выполняется ровно
+один раз, поэтому счётчики операций и обращений к адресам вычисляются
+по столбцам предекодированной программы. Время по кодам операций
+измеряется отдельным пошаговым прогоном с поправкой на накладные
+расходы таймера, а общая скорость - обычным предекодированным исполнением.
+"""
+
+import json
+import time
+from collections import Counter, defaultdict
+
+from uvm_interp import OP_LOAD_CONST, OP_MAX, OP_NAMES, _HANDLERS, run_decoded
+from uvm_memory import ADDRESS_SPACE, allocate_memory
+
+# Количество адресов и команд-писателей в отчёте по умолчанию
+DEFAULT_TOP = 10
+
+# Количество замеров при калибровке накладных расходов таймера
+_CALIBRATION_ROUNDS = 10000
+
+def _timer_overhead():
+    """Минимальное время пустого замера perf_counter_ns, нс"""
+    now = time.perf_counter_ns
+    best = None
+    for _ in range(_CALIBRATION_ROUNDS):
+        start = now()
+        elapsed = now() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best or 0
+
+def describe_source(op, src1, src2):
+    """Текстовое описание вычисляемого командой значения"""
+    if op == OP_LOAD_CONST:
+        return f"{src1}"
+    elif op == OP_MAX:
+        return f"max(m[{src1}], m[{src2}])"
+    else:
+        return f"m[{src1}]"
+
+def count_accesses(program):
+    """
+    Подсчёт чтений и записей по адресам.
+    Возвращает (Counter чтений, Counter записей, писатели по адресам),
+    где писатели - Counter пар (код операции, src1, src2) для каждого адреса.
+    """
+    reads = Counter()
+    writes = Counter()
+    writers = defaultdict(Counter)
+
+    for op, dst, src1, src2 in zip(program.opcodes, program.dst, program.src1, program.src2):
+        if op not in OP_NAMES:
+            continue
+
+        writes[dst] += 1
+        if op == OP_MAX:
+            reads[src1] += 1
+            reads[src2] += 1
+            writers[dst][(op, src1, src2)] += 1
+        elif op == OP_LOAD_CONST:
+            writers[dst][(op, src1, 0)] += 1
+        else:
+            reads[src1] += 1
+            writers[dst][(op, src1, 0)] += 1
+
+    return reads, writes, writers
+
+def time_opcodes(program, data_memory):
+    """
+    Пошаговое выполнение с замером времени каждой команды.
+    Возвращает словарь: код операции -> суммарное время, нс (за вычетом
+    накладных расходов таймера).
+    """
+    now = time.perf_counter_ns
+    overhead = _timer_overhead()
+    elapsed = Counter()
+
+    for op, dst, src1, src2 in zip(program.opcodes, program.dst, program.src1, program.src2):
+        if op not in OP_NAMES:
+            # Неизвестная операция уже сообщена при основном прогоне
+            continue
+        start = now()
+        _HANDLERS[op](data_memory, dst, src1, src2)
+        elapsed[op] += now() - start - overhead
+
+    return {op: max(0, total) for op, total in elapsed.items()}
+
+def profile_program(program, data_memory_size=ADDRESS_SPACE, memory='list', word_bits=32, top=DEFAULT_TOP):
+    """
+    Профилирование предекодированной программы.
+    Возвращает (память данных после выполнения, отчёт в виде словаря).
+    """
+    # Общая скорость: обычное исполнение таблицей обработчиков
+    data_memory = allocate_memory(data_memory_size, memory, word_bits)
+    start = time.perf_counter()
+    run_decoded(program, data_memory)
+    elapsed = time.perf_counter() - start
+
+    # Время по кодам операций: отдельный пошаговый прогон
+    timings = time_opcodes(program, allocate_memory(data_memory_size, memory, word_bits))
+    counts = Counter(program.opcodes)
+    timed_total = sum(timings.values()) or 1
+
+    opcodes = {}
+    for op, count in counts.most_common():
+        opcodes[OP_NAMES.get(op, f"unknown_{op}")] = {
+            'count': count,
+            'time': timings.get(op, 0) / 1e9,
+            'share': timings.get(op, 0) / timed_total,
+        }
+
+    reads, writes, writers = count_accesses(program)
+
+    report = {
+        'instructions': len(program),
+        'elapsed': elapsed,
+        'instructions_per_second': len(program) / elapsed if elapsed else None,
+        'opcodes': opcodes,
+        'hot_reads': [{'address': address, 'count': count}
+                      for address, count in reads.most_common(top)],
+        'hot_writes': [{'address': address, 'count': count}
+                       for address, count in writes.most_common(top)],
+        'writers': {
+            str(address): [{'op': OP_NAMES[op], 'value': describe_source(op, src1, src2),
+                            'count': count}
+                           for (op, src1, src2), count in writers[address].most_common(top)]
+            for address, _ in writes.most_common(top)
+        },
+    }
+
+    return data_memory, report
+
+def save_profile(report, output_file):
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+def print_profile(report, limit=5):
+    """Краткий вывод отчёта профилировщика"""
+    print(f"\n📈 Профиль выполнения:")
+    if report['instructions_per_second']:
+        print(f"   Скорость: {report['instructions_per_second']:,.0f} команд/с")
+
+    for name, entry in report['opcodes'].items():
+        print(f"   {name:<12} {entry['count']:10} команд  {entry['time'] * 1000:.3f} мс  ({entry['share']:.0%})")
+
+    if report['hot_writes']:
+        hot = ', '.join(f"[{entry['address']}]×{entry['count']}"
+                        for entry in report['hot_writes'][:limit])
+        print(f"   Частые записи: {hot}")
+    if report['hot_reads']:
+        hot = ', '.join(f"[{entry['address']}]×{entry['count']}"
+                        for entry in report['hot_reads'][:limit])
+        print(f"   Частые чтения: {hot}")
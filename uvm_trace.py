@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Трассировка выполнения программ УВМ.
+
+Каждое выполненное событие - (номер команды, код операции, адрес записи,
+старое значение, новое значение). Последние N событий хранятся в кольцевом
+буфере фиксированного размера, а при необходимости все события пишутся
+в компактный двоичный файл записями фиксированной длины. Стоимость
+трассировки постоянна на каждую команду и не зависит от её вида.
+"""
+
+import argparse
+import struct
+from collections import deque, namedtuple
+
+from uvm_interp import OP_MAX, OP_NAMES, _HANDLERS
+
+# Формат файла трассы: сигнатура, затем записи TRACE_RECORD
+TRACE_MAGIC = b'UVMTRC01'
+
+# Запись: номер команды (uint64), код операции (uint8), адрес записи (int32,
+# NO_ADDRESS для неизвестной операции), старое и новое значение (int64)
+TRACE_RECORD = struct.Struct('<QBiqq')
+
+# Адрес события, в котором ничего не записывается
+NO_ADDRESS = -1
+
+# Размер кольцевого буфера по умолчанию (последние события)
+DEFAULT_RING_SIZE = 32
+
+# Количество записей, накапливаемых перед записью в файл
+FLUSH_RECORDS = 4096
+
+TraceEvent = namedtuple('TraceEvent', 'index opcode address old new')
+
+class TraceRecorder:
+    """
+    Запись событий выполнения в кольцевой буфер и (необязательно) в файл трассы
+    """
+
+    def __init__(self, ring_size=DEFAULT_RING_SIZE, path=None):
+        self.ring = deque(maxlen=ring_size)
+        self.path = path
+        self.count = 0
+        self._buffer = bytearray()
+        self._file = None
+
+        if path is not None:
+            self._file = open(path, 'wb')
+            self._file.write(TRACE_MAGIC)
+
+    def record(self, index, opcode, address, old, new):
+        """Регистрация одного события"""
+        self.ring.append((index, opcode, address, old, new))
+        self.count += 1
+
+        if self._file is not None:
+            self._buffer += TRACE_RECORD.pack(index, opcode, address, old, new)
+            if len(self._buffer) >= FLUSH_RECORDS * TRACE_RECORD.size:
+                self.flush()
+
+    def flush(self):
+        if self._file is not None and self._buffer:
+            self._file.write(self._buffer)
+            self._buffer.clear()
+
+    def close(self):
+        """Запись остатка буфера и закрытие файла трассы"""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def events(self):
+        """События из кольцевого буфера (от старых к новым)"""
+        return [TraceEvent(*event) for event in self.ring]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def run_traced(program, data_memory, recorder, start=0):
+    """
+    Выполнение предекодированной программы с записью каждого события.
+    start - номер первой команды program (для нумерации событий).
+    """
+    record = recorder.record
+
+    for index, (op, dst, src1, src2) in enumerate(
+            zip(program.opcodes, program.dst, program.src1, program.src2), start):
+        if op in OP_NAMES:
+            old = data_memory[dst]
+            _HANDLERS[op](data_memory, dst, src1, src2)
+            record(index, op, dst, int(old), int(data_memory[dst]))
+        else:
+            _HANDLERS[op](data_memory, dst, src1, src2)
+            record(index, op, NO_ADDRESS, 0, 0)
+
+    return data_memory
+
+def format_event(event):
+    """Текстовое представление события трассы"""
+    index, opcode, address, old, new = event
+    name = OP_NAMES.get(opcode)
+
+    if name is None or address == NO_ADDRESS:
+        return f"  [{index:6}] ⚠ неизвестная операция {opcode}"
+
+    marker = "🔷" if opcode == OP_MAX else "  "
+    return f"  [{index:6}] {marker} {name:<10} memory[{address}]: {old} -> {new}"
+
+def print_events(events, title="🔍 Последние события выполнения"):
+    events = list(events)
+    print(f"\n{title} ({len(events)}):")
+    for event in events:
+        print(format_event(event))
+
+def read_trace(path):
+    """
+    Чтение файла трассы: генератор TraceEvent
+    """
+    with open(path, 'rb') as file:
+        if file.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError(f"{path}: неизвестный формат файла трассы")
+
+        size = TRACE_RECORD.size
+        while True:
+            block = file.read(size * FLUSH_RECORDS)
+            if not block:
+                break
+
+            tail = len(block) % size
+            if tail:
+                # Обрыв записи в конце файла (например, прерванное выполнение)
+                block = block[:-tail]
+            for record in TRACE_RECORD.iter_unpack(block):
+                yield TraceEvent(*record)
+            if tail:
+                break
+
+def main():
+    parser = argparse.ArgumentParser(description='Просмотр файла трассы выполнения УВМ')
+    parser.add_argument('trace', help='Файл трассы (uvm_interp.py --trace)')
+    parser.add_argument('-n', '--last', type=int, default=None,
+                       help='Показать только последние N событий')
+    parser.add_argument('-a', '--address', type=int, default=None,
+                       help='Показать только записи в указанный адрес')
+
+    args = parser.parse_args()
+
+    if args.last is not None and args.last <= 0:
+        print("❌ --last должен быть положительным")
+        return
+
+    try:
+        events = read_trace(args.trace)
+        if args.address is not None:
+            events = (event for event in events if event.address == args.address)
+        if args.last is not None:
+            events = deque(events, maxlen=args.last)
+
+        for event in events:
+            print(format_event(event))
+    except FileNotFoundError:
+        print(f"❌ Файл не найден: {args.trace}")
+    except ValueError as e:
+        print(f"❌ {e}")
+
+if __name__ == "__main__":
+    main()